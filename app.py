@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime
 import logging
 import re
@@ -169,6 +168,7 @@ def exibir_resultados(resultado):
     st.subheader("1. Conformidade dos Parâmetros")
     
     df_data = [{'Parâmetro': v['parametro'], 'Projeto': v['valor_projeto'], 'Legislação': v['limite_legislacao'], 'Status': "✅ Conforme" if v['conforme'] else "❌ NÃO CONFORME"} for v in validacoes]
+    import pandas as pd  # Import tardio: só o relatório usa pandas
     df = pd.DataFrame(df_data)
     st.dataframe(df, use_container_width=True, hide_index=True)
     
@@ -3,77 +3,201 @@
 # Fix SQLite compatibility for ChromaDB - MUST be before any other imports
 import chroma_wrapper
 
-import os, asyncio, streamlit as st, re, json, time, pathlib, logging
+import os, io, asyncio, contextlib, streamlit as st, re, json, time, random, heapq, pathlib, logging, threading, hashlib, sqlite3
+from collections import ChainMap, OrderedDict
 from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple, Any
 from dataclasses import dataclass
+from types import MappingProxyType
 from dotenv import load_dotenv
 
-# Load environment variables early
-load_dotenv()
+# Load environment variables early (uma vez por processo: o Streamlit reexecuta o script a cada rerun)
+@st.cache_resource(show_spinner=False)
+def _carregar_env() -> bool:
+    return load_dotenv()
+
+_carregar_env()
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain.prompts import PromptTemplate
-from langchain_google_genai import GoogleGenerativeAI
-from langchain.chains.question_answering import load_qa_chain
 from chroma_wrapper import Chroma
 from langchain.schema import Document
 import pypdf
 import pandas as pd
+import numpy as np
 from datetime import datetime
 from utils import encontrar_zona_por_endereco
 
 # SOLUÇÃO DEFINITIVA LAYER 36 - ZONEAMENTO LEI 15.511/2019
 from geocuritiba_layer36_solution import detect_zone_professional
 
+try:
+    import orjson as json_parser  # Parser JSON mais rápido (opcional)
+except ImportError:
+    json_parser = json
+
+try:
+    import pymupdf as fitz  # Extração de PDF via MuPDF (opcional, bem mais rápida que pypdf)
+except ImportError:
+    fitz = None
+
+try:
+    from zona_mapping import normalizar_zona  # Mapeamento de nomes de zona (opcional)
+except ImportError:
+    def normalizar_zona(zona: str) -> str:
+        """Sem zona_mapping: mantém a zona original"""
+        return zona
+
 # Módulos obsoletos removidos - agora usando apenas geocuritiba_layer36_solution
 
 # Configuração de logging otimizada
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ProjectConfig:
     """Configurações centralizadas do projeto"""
     PASTA_DADOS_RAIZ: pathlib.Path = pathlib.Path(__file__).parent / "dados"
     PASTA_BD: pathlib.Path = pathlib.Path(__file__).parent / "db"
+    # Caches locais fora do diretório persistido pelo Chroma
+    PASTA_CACHE: pathlib.Path = pathlib.Path(__file__).parent / "cache"
     MODELO_EMBEDDING: str = "sentence-transformers/all-MiniLM-L6-v2"
     NOME_BASE_COLECAO: str = "regulamentacao"
     MODELO_LLM: str = "gemini-1.5-pro-latest"
     CAMINHO_MAPA_ZONEAMENTO: pathlib.Path = pathlib.Path(__file__).parent / "mapas" / "feature_20250828120625247331.shp"
     VERSAO_APP: str = "6.0"
     MAX_WORKERS: int = 4
+    EMBEDDING_THREADS: int = 1
+    EMBEDDING_BATCH_SIZE: int = 64
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 50_000
     CACHE_TTL: int = 3600
+    CACHE_MAX_ENTRIES: int = 32
     CHUNK_SIZE: int = 1500
     OVERLAP_SIZE: int = 300
 
 CONFIG = ProjectConfig()
 
-class CacheManager:
-    """Gerenciador de cache otimizado"""
+# Garante uma única carga do modelo de embeddings entre sessões concorrentes
+_embeddings_lock = threading.Lock()
+
+def _limitar_threads_inferencia(num_threads: int):
+    """Limita as threads de inferência para evitar disputa de núcleos entre sessões"""
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(num_threads)
+
+def _dispositivo_inferencia() -> str:
+    """'cuda' quando há GPU disponível para o torch, senão 'cpu'"""
+    try:
+        import torch
+    except ImportError:
+        return "cpu"
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+class HuggingFaceEmbeddingsAMP(HuggingFaceEmbeddings):
+    """HuggingFaceEmbeddings com autocast fp16 quando o modelo roda em GPU"""
+    
+    def _autocast(self):
+        if self.model_kwargs.get("device") != "cuda":
+            # Na CPU sem AMX o bf16 fica mais lento que fp32
+            return contextlib.nullcontext()
+        import torch
+        return torch.autocast(device_type="cuda", dtype=torch.float16)
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with self._autocast():
+            return super().embed_documents(texts)
+    
+    def embed_query(self, text: str) -> List[float]:
+        with self._autocast():
+            return super().embed_query(text)
+
+class EmbeddingCache:
+    """Cache persistente (SQLite) de vetores de embedding em float32"""
+    
+    LOTE_SQL = 500  # Limite de parâmetros por consulta IN (...)
+    
+    def __init__(self, cache_file: pathlib.Path, max_entries: int = 50_000):
+        self.cache_file = cache_file
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(cache_file), check_same_thread=False)
+        with self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (chave BLOB PRIMARY KEY, vetor BLOB NOT NULL)")
+    
+    def get_many(self, chaves: List[bytes]) -> Dict[bytes, List[float]]:
+        encontrados = {}
+        with self._lock:
+            for inicio in range(0, len(chaves), self.LOTE_SQL):
+                lote = chaves[inicio:inicio + self.LOTE_SQL]
+                linhas = self._conn.execute(
+                    f"SELECT chave, vetor FROM embeddings WHERE chave IN ({','.join('?' * len(lote))})", lote
+                ).fetchall()
+                for chave, vetor in linhas:
+                    encontrados[chave] = np.frombuffer(vetor, dtype=np.float32).tolist()
+        return encontrados
+    
+    def set_many(self, itens: Dict[bytes, List[float]]):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (chave, vetor) VALUES (?, ?)",
+                [(chave, np.asarray(vetor, dtype=np.float32).tobytes()) for chave, vetor in itens.items()]
+            )
+            # Descarta as entradas mais antigas (rowid crescente) acima do limite
+            excesso = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] - self.max_entries
+            if excesso > 0:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE rowid IN (SELECT rowid FROM embeddings ORDER BY rowid LIMIT ?)",
+                    (excesso,)
+                )
+
+class CachedEmbeddings:
+    """Embeddings com cache persistente chaveado por SHA-256 de modelo + texto"""
     
-    def __init__(self):
-        self._cache = {}
-        self._timestamps = {}
+    def __init__(self, inner, cache: EmbeddingCache, model_name: str):
+        self.inner = inner
+        self.cache = cache
+        self.model_name = model_name
     
-    def get(self, key: str, default=None):
-        if key in self._cache:
-            if time.time() - self._timestamps[key] < CONFIG.CACHE_TTL:
-                return self._cache[key]
-            else:
-                self.invalidate(key)
-        return default
+    def _chave(self, tipo: str, texto: str) -> bytes:
+        return hashlib.sha256(f"{self.model_name}\x00{tipo}\x00{texto}".encode('utf-8')).digest()
     
-    def set(self, key: str, value):
-        self._cache[key] = value
-        self._timestamps[key] = time.time()
+    def _buscar(self, chaves: List[bytes]) -> Dict[bytes, List[float]]:
+        try:
+            return self.cache.get_many(chaves)
+        except Exception as e:
+            logger.warning(f"Erro ao ler cache de embeddings: {e}")
+            return {}
     
-    def invalidate(self, key: str):
-        self._cache.pop(key, None)
-        self._timestamps.pop(key, None)
-
-# Cache global
-cache = CacheManager()
+    def _guardar(self, itens: Dict[bytes, List[float]]):
+        try:
+            self.cache.set_many(itens)
+        except Exception as e:
+            logger.warning(f"Erro ao salvar cache de embeddings: {e}")
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        texts = list(texts)
+        chaves = [self._chave("d", texto) for texto in texts]
+        vetores = self._buscar(chaves)
+        
+        # Textos ausentes do cache (sem repetição) vão ao modelo em um único lote
+        faltantes = {chave: texto for chave, texto in zip(chaves, texts) if chave not in vetores}
+        if faltantes:
+            novos = dict(zip(faltantes, self.inner.embed_documents(list(faltantes.values()))))
+            self._guardar(novos)
+            vetores.update(novos)
+        return [vetores[chave] for chave in chaves]
+    
+    def embed_query(self, text: str) -> List[float]:
+        chave = self._chave("q", text)
+        vetor = self._buscar([chave]).get(chave)
+        if vetor is None:
+            vetor = self.inner.embed_query(text)
+            self._guardar({chave: vetor})
+        return vetor
 
 class ResourceManager:
     """Gerenciador otimizado de recursos"""
@@ -85,51 +209,129 @@ class ResourceManager:
     @property
     def embeddings(self):
         if self._embeddings is None:
-            logger.info("Carregando modelo de embeddings...")
-            self._embeddings = HuggingFaceEmbeddings(
-                model_name=CONFIG.MODELO_EMBEDDING,
-                model_kwargs={"device": "cpu"},
-                encode_kwargs={'normalize_embeddings': True}  # Melhora a precisão
-            )
+            self._embeddings = _build_embeddings()
         return self._embeddings
     
     def get_resources(self, cidade: str) -> Dict[str, Any]:
-        cache_key = f"resources_{cidade}"
-        resources = cache.get(cache_key)
-        
-        if resources is None:
-            logger.info(f"Carregando recursos para {cidade}...")
-            nome_colecao = f"{CONFIG.NOME_BASE_COLECAO}_{cidade.lower()}"
-            
-            vectorstore = Chroma(
+        return _build_resources(cidade)
+    
+    async def _load_resources(self, cidade: str) -> Dict[str, Any]:
+        """Constrói vectorstore e LLM em paralelo (ambos limitados por I/O)"""
+        nome_colecao = f"{CONFIG.NOME_BASE_COLECAO}_{cidade.lower()}"
+        
+        def criar_vectorstore():
+            cliente = _criar_cliente_chroma()
+            if cliente is not None:
+                return Chroma(
+                    client=cliente,
+                    embedding_function=self.embeddings,
+                    collection_name=nome_colecao
+                )
+            return Chroma(
                 persist_directory=str(CONFIG.PASTA_BD),
                 embedding_function=self.embeddings,
                 collection_name=nome_colecao
             )
-            
-            llm = GoogleGenerativeAI(
+        
+        def criar_llm():
+            # Import tardio: o cliente Gemini só é necessário quando a primeira cidade é carregada
+            from langchain_google_genai import GoogleGenerativeAI
+            return GoogleGenerativeAI(
                 model=CONFIG.MODELO_LLM,
                 temperature=0.1,
                 max_retries=3
             )
-            
-            resources = {
-                "vectorstore": vectorstore,
-                "llm": llm,
-                "embeddings": self.embeddings
-            }
-            cache.set(cache_key, resources)
-            logger.info(f"Recursos para {cidade} carregados e cached")
         
-        return resources
+        vectorstore, llm = await asyncio.gather(
+            asyncio.to_thread(criar_vectorstore),
+            asyncio.to_thread(criar_llm)
+        )
+        
+        return {
+            "vectorstore": vectorstore,
+            "llm": llm,
+            "embeddings": self.embeddings,
+            # Um retriever por vectorstore, reaproveitado entre análises
+            "retriever": DocumentRetriever(vectorstore)
+        }
+
+def _criar_cliente_chroma():
+    """
+    Cliente HTTP do servidor Chroma quando CHROMA_MODE=http (ex.: `chroma run --path ./db --port 8000`).
+    
+    No modo servidor as leituras de várias sessões não disputam o lock do SQLite
+    embutido no processo do Streamlit. Retorna None no modo embutido (padrão) ou
+    se o servidor não responder.
+    """
+    if os.getenv("CHROMA_MODE", "embedded").lower() != "http":
+        return None
+    host = os.getenv("CHROMA_HOST", "localhost")
+    porta = int(os.getenv("CHROMA_PORT", "8000"))
+    try:
+        import chromadb
+        cliente = chromadb.HttpClient(host=host, port=porta)
+        cliente.heartbeat()
+        return cliente
+    except Exception as e:
+        logger.warning(f"Servidor Chroma em {host}:{porta} indisponível, usando modo embutido: {e}")
+        return None
+
+@st.cache_resource(show_spinner=False)
+def _build_embeddings():
+    """Modelo de embeddings único por processo (sobrevive a reruns e é compartilhado entre sessões)"""
+    with _embeddings_lock:
+        logger.info("Carregando modelo de embeddings...")
+        dispositivo = _dispositivo_inferencia()
+        if dispositivo == "cpu":
+            _limitar_threads_inferencia(CONFIG.EMBEDDING_THREADS)
+        embeddings = HuggingFaceEmbeddingsAMP(
+            model_name=CONFIG.MODELO_EMBEDDING,
+            model_kwargs={"device": dispositivo},
+            encode_kwargs={'normalize_embeddings': True, 'batch_size': CONFIG.EMBEDDING_BATCH_SIZE}  # Melhora a precisão
+        )
+
+        try:
+            # Modelo e classe de embeddings na chave: trocar o backend não reaproveita vetores antigos
+            embeddings = CachedEmbeddings(
+                embeddings,
+                EmbeddingCache(CONFIG.PASTA_CACHE / "embedding_cache.sqlite", CONFIG.EMBEDDING_CACHE_MAX_ENTRIES),
+                f"{CONFIG.MODELO_EMBEDDING}:{type(embeddings).__name__}"
+            )
+        except Exception as e:
+            logger.warning(f"Cache de embeddings indisponível: {e}")
+        return embeddings
+
+@st.cache_resource(show_spinner=False, ttl=CONFIG.CACHE_TTL, max_entries=CONFIG.CACHE_MAX_ENTRIES)
+def _build_resources(cidade: str) -> Dict[str, Any]:
+    """Vectorstore, LLM e retriever por cidade, compartilhados entre sessões e reruns"""
+    logger.info(f"Carregando recursos para {cidade}...")
+    resources = asyncio.run(resource_manager._load_resources(cidade))
+    logger.info(f"Recursos para {cidade} carregados e cached")
+    return resources
 
 # Instância global do gerenciador
 resource_manager = ResourceManager()
 
+def embed_textos_em_lote(embeddings, textos: List[str], batch_size: int = None) -> List[List[float]]:
+    """
+    Gera embeddings em lotes ordenados por tamanho (smart batching).
+    
+    Textos repetidos são calculados uma única vez e cada lote agrupa textos de
+    comprimento parecido, reduzindo o padding. O resultado segue a ordem de entrada.
+    """
+    batch_size = batch_size or CONFIG.EMBEDDING_BATCH_SIZE
+    unicos = sorted(set(textos), key=len)
+    vetores = {}
+    for i in range(0, len(unicos), batch_size):
+        lote = unicos[i:i + batch_size]
+        vetores.update(zip(lote, embeddings.embed_documents(lote)))
+    return [vetores[texto] for texto in textos]
+
 # Detector de zoneamento removido - usando apenas Layer 36 solution
 
 class ProjectDataCalculator:
     """Calculadora de parâmetros urbanísticos do projeto"""
+    __slots__ = ()
     
     @staticmethod
     def calcular_taxa_ocupacao(area_projecao: float, area_lote: float) -> float:
@@ -178,7 +380,7 @@ class ProjectDataCalculator:
         
         return erros
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ParameterLimit:
     """Representa um limite de parâmetro com min/max"""
     name: str
@@ -186,6 +388,13 @@ class ParameterLimit:
     max_value: Optional[float] = None
     unit: str = ""
     
+    @classmethod
+    @lru_cache(maxsize=4096, typed=True)
+    def get(cls, name: str, min_value: Optional[float] = None,
+            max_value: Optional[float] = None, unit: str = "") -> 'ParameterLimit':
+        """Retorna instância compartilhada para limites idênticos (imutáveis, podem ser reaproveitados)"""
+        return cls(name=name, min_value=min_value, max_value=max_value, unit=unit)
+    
     def validate(self, project_value: float) -> Tuple[bool, str]:
         """Valida se valor do projeto está dentro dos limites"""
         errors = []
@@ -214,6 +423,7 @@ class ParameterLimit:
 
 class HeightConverter:
     """Conversor inteligente entre metros e pavimentos"""
+    __slots__ = ()
     
     # Padrões típicos de altura por pavimento
     ALTURA_PADRAO_PAVIMENTO = 3.0  # metros (conforme prática de mercado)
@@ -235,15 +445,12 @@ class HeightConverter:
     @staticmethod
     def detectar_unidade_altura(valor: float) -> str:
         """Detecta se um valor provavelmente representa metros ou pavimentos"""
-        # Lógica melhorada baseada em ranges típicos
-        if valor <= 6:  # Até 6 pode ser pavimentos (comum em legislação)
-            return "pavimentos" 
-        elif valor > 6 and valor <= 40:  # Entre 6 e 40 são provavelmente metros
-            return "metros"
-        elif valor > 40:  # Acima de 40 provavelmente metros (prédios altos)
+        # Até 6 pode ser pavimentos (comum em legislação); acima disso são metros
+        if valor <= 6:
+            return "pavimentos"
+        if valor > 6:
             return "metros"
-        else:
-            return "ambiguo"
+        return "ambiguo"  # Só NaN não cai em nenhuma das faixas
     
     @staticmethod
     def normalizar_altura(valor: float, unidade_detectada: str = None) -> dict:
@@ -329,7 +536,8 @@ class ParameterExtractor:
         # Padrões específicos encontrados nos dados oficiais
         "taxa_ocupacao_embasamento": re.compile(r"(\d+)%\s*\(.*?(\d+)%.*?embasamento", re.IGNORECASE),
         "taxa_ocupacao_subsolo_terreo": re.compile(r"(\d+)%\s*\(subsolo.*?t[eé]rreo.*?2.*?\).*?(\d+)%.*?demais", re.IGNORECASE),
-        "taxa_ocupacao_faixa_historica": re.compile(r"(\d+)[-–](\d+)%", re.IGNORECASE),
+        # re.ASCII só onde não muda o resultado: sem \s/\w e sem letras com dobra Unicode (i, k, s)
+        "taxa_ocupacao_faixa_historica": re.compile(r"(\d+)[-–](\d+)%", re.IGNORECASE | re.ASCII),
         "taxa_ocupacao_multiplos_pavimentos": re.compile(r"(\d+)%.*?\(.*?(\d+)%.*?(subsolo|t[eé]rreo|pavimento)", re.IGNORECASE),
         
         # Padrões para zonas especiais
@@ -351,7 +559,7 @@ class ParameterExtractor:
         "alta_verticalizacao": re.compile(r"alta\s+verticaliza[çc][ãa]o", re.IGNORECASE),
         
         # Padrões para afastamentos especiais (H/6, H/5, etc.)
-        "afastamento_h_formula": re.compile(r"H/(\d+)", re.IGNORECASE),
+        "afastamento_h_formula": re.compile(r"H/(\d+)", re.IGNORECASE | re.ASCII),
         
         # Padrões para usos mistos e especiais
         "uso_misto": re.compile(r"uso\s+misto", re.IGNORECASE),
@@ -371,27 +579,86 @@ class ParameterExtractor:
         "baixa_densidade": re.compile(r"baixa\s+densidade", re.IGNORECASE),
         "alta_densidade": re.compile(r"alta\s+densidade", re.IGNORECASE),
     }
-    
+
+    # Trecho literal obrigatório em qualquer ocorrência de cada padrão. Se a âncora
+    # não aparece no texto, o padrão não pode casar e a busca é evitada.
+    ANCORAS = {
+        "taxa": ("taxa_ocupacao", "taxa_ocupacao_min", "taxa_ocupacao_max", "taxa_ocupacao_faixa"),
+        "coeficiente": ("coeficiente_aproveitamento", "coeficiente_aproveitamento_min",
+                        "coeficiente_aproveitamento_max", "coeficiente_aproveitamento_faixa"),
+        "altura": ("altura_edificacao", "altura_edificacao_min", "altura_edificacao_max",
+                   "altura_edificacao_faixa", "altura_livre"),
+        "recuo": ("recuo_frontal", "recuos_laterais", "recuo_fundos",
+                  "recuo_frontal_min", "recuos_laterais_min", "recuo_fundos_min",
+                  "recuo_frontal_max", "recuos_laterais_max", "recuo_fundos_max"),
+        "perm": ("area_permeavel", "area_permeavel_min", "area_permeavel_max", "area_permeavel_faixa"),
+        "%": ("taxa_ocupacao_com_excecao", "taxa_ocupacao_embasamento", "taxa_ocupacao_subsolo_terreo",
+              "taxa_ocupacao_faixa_historica", "taxa_ocupacao_multiplos_pavimentos",
+              "ate_100_embasamento", "ate_100_no_embasamento"),
+        "norma": ("norma_propria",),
+        "pav": ("altura_pavimentos", "altura_pavimentos_max", "altura_pavimentos_excecao"),
+        "quadro": ("conforme_quadro", "quadro_proprio"),
+        "verticaliza": ("alta_verticalizacao",),
+        "h/": ("afastamento_h_formula",),
+        "misto": ("uso_misto",),
+        "servi": ("comercio_servico",),
+        "habita": ("habitacao_unifamiliar", "habitacao_coletiva"),
+        "x": ("lote_dimensoes",),
+        "m": ("porte_m2", "porte_m2_comercio"),
+        "densidade": ("media_densidade", "baixa_densidade", "alta_densidade"),
+    }
+    ANCORA_POR_PADRAO = {param: ancora for ancora, params in ANCORAS.items() for param in params}
+    
+    # Trechos literais adicionais dos padrões com ".*?", os mais caros (retrocedem até o fim
+    # do texto quando não casam). Cada tupla é um grupo de alternativas; todos os grupos
+    # precisam aparecer no texto para que a busca seja feita.
+    ANCORAS_ADICIONAIS = {
+        "taxa_ocupacao_com_excecao": (("(",), ("lote", "menor")),
+        "taxa_ocupacao_embasamento": (("(",), ("embasamento",)),
+        "taxa_ocupacao_subsolo_terreo": (("(subsolo",), ("rreo",), ("demais",)),
+        "taxa_ocupacao_multiplos_pavimentos": (("(",), ("subsolo", "rreo", "pavimento")),
+        "ate_100_embasamento": (("embasamento",),),
+        "altura_pavimentos_excecao": (("frente", "enc", "arterial"),),
+        "comercio_servico": (("rcio",),),
+        "porte_m2_comercio": (("rcio", "servi"),),
+    }
+
+    # Chaves de saída dos padrões de faixa, montadas uma vez em vez de a cada casamento
+    CHAVES_FAIXA = {
+        param: tuple(f"{param.replace('_faixa', '')}{sufixo}" for sufixo in ("_min", "_max", "_faixa_detectada"))
+        for param in PATTERNS if "_faixa" in param
+    }
+    # Resultado inicial: todo padrão não-faixa começa como None e só é sobrescrito quando casa
+    _RESULTADO_VAZIO = dict.fromkeys((param for param in PATTERNS if "_faixa" not in param), None)
+    # Padrões cuja chave também é gravada por altura_edificacao: quando não casam, voltam a None
+    _CHAVES_REESCRITAS = frozenset({"altura_pavimentos"})
+
     @classmethod
     def extract(cls, texto: str) -> Dict[str, Optional[float]]:
-        parametros = {}
-        
+        parametros = cls._RESULTADO_VAZIO.copy()
+        # "ı"/"İ" casam com "i" no IGNORECASE do re, mas casefold() preserva "ı" e vira "İ" em "i̇"
+        texto_normalizado = texto.replace("İ", "i").casefold().replace("ı", "i")
+
         for param, pattern in cls.PATTERNS.items():
-            match = pattern.search(texto)
+            # Só roda o re.search nos padrões cujas âncoras literais aparecem no texto
+            ancora = cls.ANCORA_POR_PADRAO.get(param)
+            adicionais = cls.ANCORAS_ADICIONAIS.get(param, ())
+            candidato = (ancora is None or ancora in texto_normalizado) and all(
+                any(a in texto_normalizado for a in grupo) for grupo in adicionais)
+            match = pattern.search(texto) if candidato else None
             if match:
                 try:
                     # Tratamento especial para padrões de faixa (têm 2 grupos)
-                    if "_faixa" in param:
+                    chaves_faixa = cls.CHAVES_FAIXA.get(param)
+                    if chaves_faixa:
                         valor_min = float(match.group(1).replace(',', '.'))
                         valor_max = float(match.group(2).replace(',', '.'))
                         
-                        # Extrair nome base do parâmetro
-                        base_param = param.replace("_faixa", "")
-                        
                         # Definir valores min e max
-                        parametros[f"{base_param}_min"] = valor_min
-                        parametros[f"{base_param}_max"] = valor_max
-                        parametros[f"{base_param}_faixa_detectada"] = True
+                        chave_min, chave_max, chave_detectada = chaves_faixa
+                        parametros[chave_min] = valor_min
+                        parametros[chave_max] = valor_max
+                        parametros[chave_detectada] = True
                         
                     else:
                         # Padrões normais (1 grupo)
@@ -407,9 +674,8 @@ class ParameterExtractor:
                         
                 except ValueError:
                     parametros[param] = None
-            else:
-                if "_faixa" not in param:  # Só define None para padrões não-faixa
-                    parametros[param] = None
+            elif param in cls._CHAVES_REESCRITAS:
+                parametros[param] = None
         
         return parametros
 
@@ -419,51 +685,50 @@ class ParameterLimitExtractor:
     @staticmethod
     def extract_limits(text: str) -> Dict[str, ParameterLimit]:
         """Extrai todos os limites de parâmetros do texto"""
+        # Extrair parâmetros do texto uma única vez para todos os limites
+        parametros = ParameterExtractor.extract(text)
         limits = {}
         
         # Taxa de Ocupação
-        limits['taxa_ocupacao'] = ParameterLimitExtractor._extract_parameter_limit(
-            text, 'taxa_ocupacao', '%'
+        limits['taxa_ocupacao'] = ParameterLimitExtractor._build_limit(
+            parametros, 'taxa_ocupacao', '%'
         )
         
         # Coeficiente de Aproveitamento  
-        limits['coeficiente_aproveitamento'] = ParameterLimitExtractor._extract_parameter_limit(
-            text, 'coeficiente_aproveitamento', ''
+        limits['coeficiente_aproveitamento'] = ParameterLimitExtractor._build_limit(
+            parametros, 'coeficiente_aproveitamento', ''
         )
         
         # Área Permeável
-        limits['area_permeavel'] = ParameterLimitExtractor._extract_parameter_limit(
-            text, 'area_permeavel', '%'
+        limits['area_permeavel'] = ParameterLimitExtractor._build_limit(
+            parametros, 'area_permeavel', '%'
         )
         
         # Altura da Edificação
-        limits['altura_edificacao'] = ParameterLimitExtractor._extract_parameter_limit(
-            text, 'altura_edificacao', 'm'
+        limits['altura_edificacao'] = ParameterLimitExtractor._build_limit(
+            parametros, 'altura_edificacao', 'm'
         )
         
         # Recuo Frontal
-        limits['recuo_frontal'] = ParameterLimitExtractor._extract_parameter_limit(
-            text, 'recuo_frontal', 'm'
+        limits['recuo_frontal'] = ParameterLimitExtractor._build_limit(
+            parametros, 'recuo_frontal', 'm'
         )
         
         # Recuos Laterais
-        limits['recuos_laterais'] = ParameterLimitExtractor._extract_parameter_limit(
-            text, 'recuos_laterais', 'm'
+        limits['recuos_laterais'] = ParameterLimitExtractor._build_limit(
+            parametros, 'recuos_laterais', 'm'
         )
         
         # Recuo de Fundos
-        limits['recuo_fundos'] = ParameterLimitExtractor._extract_parameter_limit(
-            text, 'recuo_fundos', 'm'
+        limits['recuo_fundos'] = ParameterLimitExtractor._build_limit(
+            parametros, 'recuo_fundos', 'm'
         )
         
         return limits
     
     @staticmethod
-    def _extract_parameter_limit(text: str, param_name: str, unit: str) -> ParameterLimit:
-        """Extrai limite min/max de um parâmetro específico"""
-        # Extrair parâmetros do texto
-        parametros = ParameterExtractor.extract(text)
-        
+    def _build_limit(parametros: Dict[str, Any], param_name: str, unit: str) -> ParameterLimit:
+        """Monta limite min/max de um parâmetro a partir dos valores já extraídos"""
         # Buscar valores min e max específicos
         min_key = f"{param_name}_min"
         max_key = f"{param_name}_max"
@@ -477,21 +742,85 @@ class ParameterLimitExtractor:
             if general_val is not None:
                 max_val = general_val  # Por padrão, valor geral é tratado como máximo
         
-        return ParameterLimit(
+        return ParameterLimit.get(
             name=param_name,
             min_value=min_val,
             max_value=max_val,
             unit=unit
         )
 
+# Dados JSON já carregados, compartilhados entre instâncias: (caminho, mtime) -> dados
+_json_cache: Dict[str, Tuple[float, Any]] = {}  # caminho -> (mtime, dados); uma versão por arquivo
+
+def _load_json_file(path: str) -> Any:
+    """Lê um arquivo JSON reaproveitando o parse enquanto o arquivo não mudar"""
+    caminho = pathlib.Path(path)
+    cache_key = str(caminho.resolve())
+    mtime = caminho.stat().st_mtime
+    entrada = _json_cache.get(cache_key)
+    if entrada is not None and entrada[0] == mtime:
+        return entrada[1]
+    dados = json_parser.loads(caminho.read_bytes())
+    _json_cache[cache_key] = (mtime, dados)  # Substitui a versão anterior do mesmo arquivo
+    return dados
+
+@dataclass(slots=True, frozen=True)
+class ZoneResolution:
+    """Resultado da resolução de uma zona: dados oficiais, ocupação detalhada e limites"""
+    zone_data: Mapping[str, Any]
+    ocupacao_data: Mapping[str, Any]
+    limits: Mapping[str, ParameterLimit]
+
 class ZoneDataManager:
     """Gerenciador de dados oficiais de zoneamento"""
     
+    # Variações conhecidas
+    ZONE_MAPPINGS = MappingProxyType({
+        'ZCC.4': 'ZCC',
+        'ZR1': 'ZR-1', 'ZR2': 'ZR-2', 'ZR3': 'ZR-3', 'ZR4': 'ZR-4',
+        'ZS1': 'ZS-1', 'ZS2': 'ZS-2',
+        'ZUM1': 'ZUM-1', 'ZUM2': 'ZUM-2', 'ZUM3': 'ZUM-3',
+        'ECO1': 'ECO-1', 'ECO2': 'ECO-2', 'ECO3': 'ECO-3', 'ECO4': 'ECO-4',
+        'ZH1': 'ZH-1', 'ZH2': 'ZH-2'
+    })
+    
+    # (chave nos dados oficiais, nome do limite, unidade) dos parâmetros com limites simples
+    _LIMITES_SIMPLES = (
+        ('coeficiente_aproveitamento', 'coeficiente_aproveitamento', ''),
+        ('altura_pavimentos', 'altura_edificacao', 'pav'),
+        ('taxa_permeavel', 'area_permeavel', '%'),
+        ('recuo_frontal', 'recuo_frontal', 'm'),
+    )
+    
+    ARQUIVO_ZONAS = "zoneamento_curitiba_completo.json"
+    ARQUIVO_OCUPACAO = "taxa_ocupacao_detalhada.json"
+    
     def __init__(self, json_file_path: str = None, ocupacao_file_path: str = None):
-        self.json_file_path = json_file_path or "zoneamento_curitiba_completo.json"
-        self.ocupacao_file_path = ocupacao_file_path or "taxa_ocupacao_detalhada.json"
-        self.zones_data = self._load_zones_data()
-        self.ocupacao_data = self._load_ocupacao_data()
+        self.json_file_path = json_file_path or self.ARQUIVO_ZONAS
+        self.ocupacao_file_path = ocupacao_file_path or self.ARQUIVO_OCUPACAO
+        # Os dois arquivos são independentes: leitura em paralelo
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            zones_future = executor.submit(self._load_zones_data)
+            ocupacao_future = executor.submit(self._load_ocupacao_data)
+            self.zones_data = zones_future.result()
+            self.ocupacao_data = ocupacao_future.result()
+        
+        # Índices das formas alternativas (sem hífen / sem ponto) para busca O(1)
+        self._zone_index = self._build_zone_index(self.zones_data)
+        self._ocupacao_index = self._build_zone_index(self.ocupacao_data)
+        
+        # Resolução e resumo dependem apenas dos dados carregados (não mudam após o init)
+        tamanho_cache = len(self.zones_data) + 128  # Todas as zonas oficiais + variações de nome
+        self._resolve_cached = lru_cache(maxsize=tamanho_cache)(self._resolve_normalized)
+        self._zone_summary_cached = lru_cache(maxsize=tamanho_cache)(self._build_zone_summary)
+        
+        # Pré-calcula limites e resumos de todas as zonas oficiais: nas análises só há consulta ao cache
+        # Uma zona com dados malformados não impede o carregamento: fica para resolução sob demanda
+        for zona in self.zones_data:
+            try:
+                self.get_zone_summary(zona)  # Resolve a zona (limites) e monta o resumo
+            except Exception as e:
+                logger.warning(f"Falha ao pré-calcular a zona {zona}: {e}")
     
     def _load_zones_data(self) -> Dict[str, Any]:
         """Carrega dados de zoneamento do arquivo JSON"""
@@ -500,8 +829,7 @@ class ZoneDataManager:
                 logger.warning(f"Arquivo {self.json_file_path} não encontrado")
                 return {}
             
-            with open(self.json_file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return _load_json_file(self.json_file_path)
         except Exception as e:
             logger.error(f"Erro ao carregar dados de zoneamento: {e}")
             return {}
@@ -513,58 +841,83 @@ class ZoneDataManager:
                 logger.warning(f"Arquivo {self.ocupacao_file_path} não encontrado")
                 return {}
             
-            with open(self.ocupacao_file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return _load_json_file(self.ocupacao_file_path)
         except Exception as e:
             logger.error(f"Erro ao carregar dados de ocupação: {e}")
             return {}
     
-    def get_zone_data(self, zona_name: str) -> Dict[str, Any]:
-        """Obtém dados oficiais de uma zona específica, incorporando dados de ocupação detalhados"""
-        # Normalizar nome da zona para busca
-        zona_normalized = self._normalize_zone_name(zona_name)
+    def resolve(self, zona_name: str) -> ZoneResolution:
+        """Resolve a zona em uma única passada: dados oficiais, ocupação detalhada e limites"""
+        return self._resolve_cached(self._normalize_zone_name(zona_name))
+    
+    def _resolve_normalized(self, zona_normalized: str) -> ZoneResolution:
+        # Uma busca em cada fonte de dados
+        zone_key = self._find_zone_key(zona_normalized, self.zones_data, self._zone_index)
+        ocupacao_key = self._find_zone_key(zona_normalized, self.ocupacao_data, self._ocupacao_index)
+        zone_base = self.zones_data[zone_key] if zone_key is not None else {}
+        ocupacao_detalhada = self.ocupacao_data[ocupacao_key] if ocupacao_key is not None else {}
         
-        # Busca direta nos dados principais
-        zone_data = {}
-        if zona_normalized in self.zones_data:
-            zone_data = self.zones_data[zona_normalized].copy()
-        else:
-            # Busca por variações
-            for zone_key in self.zones_data.keys():
-                if self._zones_match(zona_normalized, zone_key):
-                    zone_data = self.zones_data[zone_key].copy()
-                    break
-        
-        # Incorporar dados detalhados de taxa de ocupação se disponíveis
-        ocupacao_detalhada = self.get_ocupacao_data(zona_normalized)
+        # Incorporar dados detalhados de taxa de ocupação sem copiar nem alterar os dados carregados
+        zone_data: Mapping[str, Any] = zone_base
         if ocupacao_detalhada:
-            # Substituir dados básicos de TO pelos dados detalhados
-            zone_data['taxa_ocupacao_detalhada'] = ocupacao_detalhada['taxa_ocupacao']
-            zone_data['grupo_ocupacao'] = ocupacao_detalhada.get('grupo', '')
-            zone_data['observacoes_ocupacao'] = ocupacao_detalhada.get('observacoes', [])
-            
-            # Atualizar dados básicos de taxa de ocupação
-            if 'taxa_ocupacao' in zone_data:
+            enriquecimento = {
+                'taxa_ocupacao_detalhada': ocupacao_detalhada['taxa_ocupacao'],
+                'grupo_ocupacao': ocupacao_detalhada.get('grupo', ''),
+                'observacoes_ocupacao': ocupacao_detalhada.get('observacoes', []),
+            }
+            if 'taxa_ocupacao' in zone_base:
                 # Manter estrutura original mas adicionar dados enriquecidos
-                zone_data['taxa_ocupacao']['dados_detalhados'] = ocupacao_detalhada['taxa_ocupacao']
+                enriquecimento['taxa_ocupacao'] = {
+                    **zone_base['taxa_ocupacao'],
+                    'dados_detalhados': ocupacao_detalhada['taxa_ocupacao']
+                }
+            zone_data = ChainMap(enriquecimento, zone_base)
         
-        return zone_data
+        zone_data = MappingProxyType(zone_data)
+        return ZoneResolution(
+            zone_data=zone_data,
+            ocupacao_data=MappingProxyType(ocupacao_detalhada),
+            limits=MappingProxyType(self._build_limits(zone_data) if zone_data else {})
+        )
+    
+    def get_zone_data(self, zona_name: str) -> Mapping[str, Any]:
+        """Obtém dados oficiais de uma zona específica, incorporando dados de ocupação detalhados"""
+        return self.resolve(zona_name).zone_data
     
     def get_ocupacao_data(self, zona_name: str) -> Dict[str, Any]:
         """Obtém dados detalhados de taxa de ocupação para uma zona"""
         zona_normalized = self._normalize_zone_name(zona_name)
         
-        # Busca direta
-        if zona_normalized in self.ocupacao_data:
-            return self.ocupacao_data[zona_normalized]
-        
-        # Busca por variações
-        for zone_key in self.ocupacao_data.keys():
-            if self._zones_match(zona_normalized, zone_key):
-                return self.ocupacao_data[zone_key]
+        zone_key = self._find_zone_key(zona_normalized, self.ocupacao_data, self._ocupacao_index)
+        if zone_key is not None:
+            return self.ocupacao_data[zone_key]
         
         return {}
     
+    @staticmethod
+    def _build_zone_index(dados: Dict[str, Any]) -> Dict[Tuple[str, str], Tuple[int, str]]:
+        """Indexa as chaves pelas formas sem hífen e sem ponto (a primeira chave vence)"""
+        indice = {}
+        for posicao, chave in enumerate(dados):
+            for separador in ('-', '.'):
+                indice.setdefault((separador, chave.replace(separador, '')), (posicao, chave))
+        return indice
+    
+    @staticmethod
+    def _find_zone_key(zona_normalized: str, dados: Dict[str, Any],
+                       indice: Dict[Tuple[str, str], Tuple[int, str]]) -> Optional[str]:
+        """Localiza a chave equivalente à zona: igual, ou igual sem hífens, ou igual sem pontos"""
+        if zona_normalized in dados:
+            return zona_normalized
+        
+        candidatos = [
+            indice.get((separador, zona_normalized.replace(separador, '')))
+            for separador in ('-', '.')
+        ]
+        candidatos = [c for c in candidatos if c is not None]
+        # Mantém a ordem da varredura linear original: vence a chave que aparece primeiro
+        return min(candidatos)[1] if candidatos else None
+    
     def _normalize_zone_name(self, zona_name: str) -> str:
         """Normaliza nome da zona para busca"""
         if not zona_name:
@@ -573,30 +926,15 @@ class ZoneDataManager:
         # Remover espaços e converter para maiúsculo
         normalized = zona_name.upper().strip()
         
-        # Variações conhecidas
-        zone_mappings = {
-            'ZCC.4': 'ZCC',
-            'ZR1': 'ZR-1', 'ZR2': 'ZR-2', 'ZR3': 'ZR-3', 'ZR4': 'ZR-4',
-            'ZS1': 'ZS-1', 'ZS2': 'ZS-2',
-            'ZUM1': 'ZUM-1', 'ZUM2': 'ZUM-2', 'ZUM3': 'ZUM-3',
-            'ECO1': 'ECO-1', 'ECO2': 'ECO-2', 'ECO3': 'ECO-3', 'ECO4': 'ECO-4',
-            'ZH1': 'ZH-1', 'ZH2': 'ZH-2'
-        }
-        
-        return zone_mappings.get(normalized, normalized)
+        return self.ZONE_MAPPINGS.get(normalized, normalized)
     
-    def _zones_match(self, zona1: str, zona2: str) -> bool:
-        """Verifica se duas zonas são equivalentes"""
-        return (zona1 == zona2 or 
-                zona1.replace('-', '') == zona2.replace('-', '') or
-                zona1.replace('.', '') == zona2.replace('.', ''))
-    
-    def get_parameter_limits(self, zona_name: str) -> Dict[str, ParameterLimit]:
+    def get_parameter_limits(self, zona_name: str) -> Mapping[str, ParameterLimit]:
         """Converte dados oficiais em objetos ParameterLimit"""
-        zone_data = self.get_zone_data(zona_name)
-        if not zone_data:
-            return {}
-        
+        return self.resolve(zona_name).limits
+    
+    @staticmethod
+    def _build_limits(zone_data: Mapping[str, Any]) -> Dict[str, ParameterLimit]:
+        """Monta os objetos ParameterLimit a partir dos dados oficiais da zona"""
         limits = {}
         
         # Taxa de Ocupação - usar dados detalhados se disponíveis
@@ -605,7 +943,7 @@ class ZoneDataManager:
             
             if ocupacao_detalhada['tipo'] == 'simples':
                 # Valor simples (ex: 50%)
-                limits['taxa_ocupacao'] = ParameterLimit(
+                limits['taxa_ocupacao'] = ParameterLimit.get(
                     name='taxa_ocupacao',
                     min_value=None,
                     max_value=ocupacao_detalhada['base'],
@@ -614,7 +952,7 @@ class ZoneDataManager:
             elif ocupacao_detalhada['tipo'] == 'faixa':
                 # Faixa de valores (ex: 30-50%)
                 base_data = ocupacao_detalhada['base']
-                limits['taxa_ocupacao'] = ParameterLimit(
+                limits['taxa_ocupacao'] = ParameterLimit.get(
                     name='taxa_ocupacao',
                     min_value=base_data['min'],
                     max_value=base_data['max'],
@@ -622,7 +960,7 @@ class ZoneDataManager:
                 )
             elif ocupacao_detalhada['tipo'] == 'base_com_excecao':
                 # Base com exceção (ex: 50% até 100% no embasamento)
-                limits['taxa_ocupacao'] = ParameterLimit(
+                limits['taxa_ocupacao'] = ParameterLimit.get(
                     name='taxa_ocupacao',
                     min_value=None,
                     max_value=ocupacao_detalhada['base'],
@@ -631,7 +969,7 @@ class ZoneDataManager:
                 # Criar limite adicional para exceção
                 for excecao in ocupacao_detalhada['excecoes']:
                     if excecao['tipo'] == 'embasamento':
-                        limits['taxa_ocupacao_embasamento'] = ParameterLimit(
+                        limits['taxa_ocupacao_embasamento'] = ParameterLimit.get(
                             name='taxa_ocupacao_embasamento',
                             min_value=None,
                             max_value=excecao['valor'],
@@ -639,7 +977,7 @@ class ZoneDataManager:
                         )
             elif ocupacao_detalhada['tipo'] == 'multiplos_valores':
                 # Múltiplos valores por pavimento (ex: ZC Central)
-                limits['taxa_ocupacao'] = ParameterLimit(
+                limits['taxa_ocupacao'] = ParameterLimit.get(
                     name='taxa_ocupacao',
                     min_value=None,
                     max_value=ocupacao_detalhada['base'],  # Valor para demais pavimentos
@@ -648,66 +986,38 @@ class ZoneDataManager:
                 # Criar limite para pavimentos especiais
                 for excecao in ocupacao_detalhada['excecoes']:
                     if excecao['tipo'] == 'pavimentos_especificos':
-                        limits['taxa_ocupacao_especial'] = ParameterLimit(
+                        limits['taxa_ocupacao_especial'] = ParameterLimit.get(
                             name='taxa_ocupacao_especial',
                             min_value=None,
                             max_value=excecao['valor'],
                             unit='%'
                         )
-        elif 'taxa_ocupacao' in zone_data and zone_data['taxa_ocupacao']['limits']:
+        elif (entry := zone_data.get('taxa_ocupacao')) and (limits_data := entry.get('limits')):
             # Fallback para dados básicos se detalhados não disponíveis
-            limits_data = zone_data['taxa_ocupacao']['limits']
-            limits['taxa_ocupacao'] = ParameterLimit(
+            limits['taxa_ocupacao'] = ParameterLimit.get(
                 name='taxa_ocupacao',
                 min_value=limits_data.get('min'),
                 max_value=limits_data.get('max'),
                 unit='%'
             )
         
-        # Coeficiente de Aproveitamento
-        if 'coeficiente_aproveitamento' in zone_data and zone_data['coeficiente_aproveitamento']['limits']:
-            limits_data = zone_data['coeficiente_aproveitamento']['limits']
-            limits['coeficiente_aproveitamento'] = ParameterLimit(
-                name='coeficiente_aproveitamento',
-                min_value=limits_data.get('min'),
-                max_value=limits_data.get('max'),
-                unit=''
-            )
-        
-        # Altura/Pavimentos
-        if 'altura_pavimentos' in zone_data and zone_data['altura_pavimentos']['limits']:
-            limits_data = zone_data['altura_pavimentos']['limits']
-            limits['altura_edificacao'] = ParameterLimit(
-                name='altura_edificacao',
-                min_value=limits_data.get('min'),
-                max_value=limits_data.get('max'),
-                unit='pav'
-            )
-        
-        # Taxa Permeável
-        if 'taxa_permeavel' in zone_data and zone_data['taxa_permeavel']['limits']:
-            limits_data = zone_data['taxa_permeavel']['limits']
-            limits['area_permeavel'] = ParameterLimit(
-                name='area_permeavel',
-                min_value=limits_data.get('min'),
-                max_value=limits_data.get('max'),
-                unit='%'
-            )
-        
-        # Recuo Frontal
-        if 'recuo_frontal' in zone_data and zone_data['recuo_frontal']['limits']:
-            limits_data = zone_data['recuo_frontal']['limits']
-            limits['recuo_frontal'] = ParameterLimit(
-                name='recuo_frontal',
-                min_value=limits_data.get('min'),
-                max_value=limits_data.get('max'),
-                unit='m'
-            )
+        # Demais parâmetros: mesma estrutura {'limits': {'min', 'max'}} nos dados oficiais
+        for chave_origem, nome, unidade in ZoneDataManager._LIMITES_SIMPLES:
+            if (entry := zone_data.get(chave_origem)) and (limits_data := entry.get('limits')):
+                limits[nome] = ParameterLimit.get(
+                    name=nome,
+                    min_value=limits_data.get('min'),
+                    max_value=limits_data.get('max'),
+                    unit=unidade
+                )
         
         return limits
     
     def get_zone_summary(self, zona_name: str) -> str:
         """Gera resumo estruturado dos parâmetros da zona"""
+        return self._zone_summary_cached(zona_name)
+    
+    def _build_zone_summary(self, zona_name: str) -> str:
         zone_data = self.get_zone_data(zona_name)
         if not zone_data:
             return f"Dados não encontrados para a zona {zona_name}"
@@ -716,198 +1026,327 @@ class ZoneDataManager:
         summary_parts = [f"ZONA {zona_nome}:"]
         
         # Taxa de Ocupação - usar dados detalhados se disponíveis
-        if 'taxa_ocupacao_detalhada' in zone_data:
-            ocupacao = zone_data['taxa_ocupacao_detalhada']
+        if (ocupacao := zone_data.get('taxa_ocupacao_detalhada')) is not None:
             taxa_texto = self._format_ocupacao_display(ocupacao)
             summary_parts.append(f"- Taxa de Ocupação: {taxa_texto}")
             
             # Adicionar observações específicas de ocupação
-            if zone_data.get('observacoes_ocupacao'):
-                for obs in zone_data['observacoes_ocupacao']:
-                    summary_parts.append(f"  • {obs}")
+            for obs in zone_data.get('observacoes_ocupacao') or ():
+                summary_parts.append(f"  • {obs}")
         else:
             # Fallback para dados básicos
-            if 'taxa_ocupacao' in zone_data and zone_data['taxa_ocupacao']['valor']:
-                summary_parts.append(f"- Taxa de Ocupação: {zone_data['taxa_ocupacao']['valor']}")
+            if (entry := zone_data.get('taxa_ocupacao')) and (valor := entry.get('valor')):
+                summary_parts.append(f"- Taxa de Ocupação: {valor}")
         
         # Outros parâmetros principais
-        params = [
+        params = (
             ('Coeficiente de Aproveitamento', 'coeficiente_aproveitamento'),
             ('Altura/Pavimentos', 'altura_pavimentos'),
             ('Taxa Permeável', 'taxa_permeavel'),
             ('Recuo Frontal', 'recuo_frontal')
-        ]
+        )
         
         for param_name, param_key in params:
-            if param_key in zone_data and zone_data[param_key]['valor']:
-                summary_parts.append(f"- {param_name}: {zone_data[param_key]['valor']}")
+            if (entry := zone_data.get(param_key)) and (valor := entry.get('valor')):
+                summary_parts.append(f"- {param_name}: {valor}")
         
         # Informações adicionais
-        if zone_data.get('grupo_ocupacao'):
-            summary_parts.append(f"- Grupo: {zone_data['grupo_ocupacao']}")
+        if grupo := zone_data.get('grupo_ocupacao'):
+            summary_parts.append(f"- Grupo: {grupo}")
             
-        if zone_data.get('usos_permitidos'):
-            summary_parts.append(f"- Usos Permitidos: {zone_data['usos_permitidos']}")
+        if usos := zone_data.get('usos_permitidos'):
+            summary_parts.append(f"- Usos Permitidos: {usos}")
         
-        if zone_data.get('notas_tecnicas'):
-            summary_parts.append(f"- Notas Técnicas: {zone_data['notas_tecnicas']}")
+        if notas := zone_data.get('notas_tecnicas'):
+            summary_parts.append(f"- Notas Técnicas: {notas}")
         
         return "\n".join(summary_parts)
     
+    @staticmethod
+    def _fmt_ocupacao_simples(ocupacao_data: Mapping[str, Any]) -> str:
+        return f"{ocupacao_data['base']}%"
+    
+    @staticmethod
+    def _fmt_ocupacao_faixa(ocupacao_data: Mapping[str, Any]) -> str:
+        base = ocupacao_data['base']
+        return f"{base['min']}% a {base['max']}%"
+    
+    @staticmethod
+    def _fmt_ocupacao_base_com_excecao(ocupacao_data: Mapping[str, Any]) -> str:
+        return f"{ocupacao_data['base']}%" + "".join([
+            f" (até {excecao['valor']}% {excecao['condicao']})"
+            for excecao in ocupacao_data['excecoes'] if excecao['tipo'] == 'embasamento'
+        ])
+    
+    @staticmethod
+    def _fmt_ocupacao_multiplos_valores(ocupacao_data: Mapping[str, Any]) -> str:
+        return f"{ocupacao_data['base']}% demais pavimentos" + "".join([
+            f"; {excecao['valor']}% ({excecao['condicao']})"
+            for excecao in ocupacao_data['excecoes'] if excecao['tipo'] == 'pavimentos_especificos'
+        ])
+    
+    @staticmethod
+    def _fmt_ocupacao_norma_propria(ocupacao_data: Mapping[str, Any]) -> str:
+        return "Definido por norma própria"
+    
+    @staticmethod
+    def _fmt_ocupacao_original(ocupacao_data: Mapping[str, Any]) -> str:
+        return ocupacao_data.get('original', 'N/A')
+    
+    # Tipo de taxa de ocupação -> formatador (tipos desconhecidos exibem o texto original)
+    _FORMATADORES_OCUPACAO = MappingProxyType({
+        'simples': _fmt_ocupacao_simples,
+        'faixa': _fmt_ocupacao_faixa,
+        'base_com_excecao': _fmt_ocupacao_base_com_excecao,
+        'multiplos_valores': _fmt_ocupacao_multiplos_valores,
+        'norma_propria': _fmt_ocupacao_norma_propria,
+    })
+    
     def _format_ocupacao_display(self, ocupacao_data: Dict[str, Any]) -> str:
         """Formata dados de ocupação para exibição legível"""
-        if ocupacao_data['tipo'] == 'simples':
-            return f"{ocupacao_data['base']}%"
-        
-        elif ocupacao_data['tipo'] == 'faixa':
-            base = ocupacao_data['base']
-            return f"{base['min']}% a {base['max']}%"
-        
-        elif ocupacao_data['tipo'] == 'base_com_excecao':
-            texto = f"{ocupacao_data['base']}%"
-            for excecao in ocupacao_data['excecoes']:
-                if excecao['tipo'] == 'embasamento':
-                    texto += f" (até {excecao['valor']}% {excecao['condicao']})"
-            return texto
-        
-        elif ocupacao_data['tipo'] == 'multiplos_valores':
-            texto = f"{ocupacao_data['base']}% demais pavimentos"
-            for excecao in ocupacao_data['excecoes']:
-                if excecao['tipo'] == 'pavimentos_especificos':
-                    texto += f"; {excecao['valor']}% ({excecao['condicao']})"
-            return texto
-        
-        elif ocupacao_data['tipo'] == 'norma_propria':
-            return "Definido por norma própria"
-        
-        else:
-            return ocupacao_data.get('original', 'N/A')
+        formatador = self._FORMATADORES_OCUPACAO.get(ocupacao_data['tipo'], self._fmt_ocupacao_original)
+        return formatador(ocupacao_data)
     
     def get_available_zones(self) -> List[str]:
         """Retorna lista de zonas disponíveis"""
         return list(self.zones_data.keys())
 
-# Instância global do gerenciador de dados de zona
-zone_data_manager = ZoneDataManager()
+def _assinatura_arquivos(*caminhos: str) -> Tuple[Optional[float], ...]:
+    """mtime de cada arquivo (None se ausente): muda sempre que algum dos arquivos muda"""
+    return tuple(
+        pathlib.Path(caminho).stat().st_mtime if pathlib.Path(caminho).exists() else None
+        for caminho in caminhos
+    )
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _get_zone_data_manager(assinatura: Tuple[Optional[float], ...]) -> ZoneDataManager:
+    """Gerenciador compartilhado entre reruns e sessões; recriado só quando os JSON mudam"""
+    return ZoneDataManager()
+
+def _zone_data_manager_atual() -> ZoneDataManager:
+    """Gerenciador correspondente à versão atual dos JSON (consultar a cada análise, não guardar)"""
+    return _get_zone_data_manager(
+        _assinatura_arquivos(ZoneDataManager.ARQUIVO_ZONAS, ZoneDataManager.ARQUIVO_OCUPACAO)
+    )
+
+# Instância global do gerenciador de dados de zona (sem reparse dos JSON a cada rerun)
+zone_data_manager = _zone_data_manager_atual()
+
+# Variações especiais conhecidas por zona (usadas em DocumentRetriever._gerar_variacoes_zona).
+# Tuplas de literais: constantes imutáveis, sem listas alocadas na importação
+_VARIACOES_ESPECIAIS: Dict[str, Tuple[str, ...]] = {
+    # Zonas residenciais
+    'ZR1': ('ZR-1', 'ZR_1', 'ZR.1', 'ZONA-RESIDENCIAL-1'),
+    'ZR2': ('ZR-2', 'ZR_2', 'ZR.2', 'ZONA-RESIDENCIAL-2'),
+    'ZR3': ('ZR-3', 'ZR_3', 'ZR.3', 'ZONA-RESIDENCIAL-3'),
+    'ZR-4': ('ZR4', 'ZR_4', 'ZR.4', 'ZONA-RESIDENCIAL-4'),
+    'ZR3-T': ('ZR3T', 'ZR3_T', 'ZR-3-T', 'ZR-3T'),
+    'ZROC': ('ZR-OC', 'ZR_OC', 'ZONA-RESIDENCIAL-OC'),
+    'ZROI': ('ZR-OI', 'ZR_OI', 'ZONA-RESIDENCIAL-OI'),
+    
+    # Zona Centro Cívico (caso especial!)
+    'ZCC.4': ('ZCC', 'ZCC4', 'ZCC-4', 'ZCC_4', 'ZONA-CENTRO-CIVICO'),
+    'ZCC': ('ZCC.4', 'ZCC4', 'ZCC-4', 'ZCC_4', 'ZONA-CENTRO-CIVICO'),
+    
+    # Zonas centrais
+    'ZC': ('ZONA-CENTRAL', 'CENTRO'),
+    'ZCSF': ('ZC-SF', 'ZC_SF', 'ZONA-CENTRAL-SF'),
+    'ZCUM': ('ZC-UM', 'ZC_UM', 'ZONA-CENTRAL-UM'),
+    
+    # Zonas de serviço
+    'ZS-1': ('ZS1', 'ZS_1', 'ZS.1', 'ZONA-SERVICOS-1'),
+    'ZS-2': ('ZS2', 'ZS_2', 'ZS.2', 'ZONA-SERVICOS-2'),
+    'ZSF': ('ZS-F', 'ZS_F', 'ZONA-SERVICOS-F'),
+    'ZSM': ('ZS-M', 'ZS_M', 'ZONA-SERVICOS-M'),
+    
+    # Zonas de uso misto
+    'ZUM-1': ('ZUM1', 'ZUM_1', 'ZUM.1', 'ZONA-USO-MISTO-1'),
+    'ZUM-2': ('ZUM2', 'ZUM_2', 'ZUM.2', 'ZONA-USO-MISTO-2'),
+    'ZUM-3': ('ZUM3', 'ZUM_3', 'ZUM.3', 'ZONA-USO-MISTO-3'),
+    'ZUMVP': ('ZUM-VP', 'ZUM_VP', 'ZONA-USO-MISTO-VP'),
+    
+    # Zonas habitacionais
+    'ZH-1': ('ZH1', 'ZH_1', 'ZH.1', 'ZONA-HABITACIONAL-1'),
+    'ZH-2': ('ZH2', 'ZH_2', 'ZH.2', 'ZONA-HABITACIONAL-2'),
+    
+    # Zonas ecológicas
+    'ECO-1': ('ECO1', 'ECO_1', 'ECO.1', 'ZONA-ECOLOGICA-1'),
+    'ECO-2': ('ECO2', 'ECO_2', 'ECO.2', 'ZONA-ECOLOGICA-2'),
+    'ECO-3': ('ECO3', 'ECO_3', 'ECO.3', 'ZONA-ECOLOGICA-3'),
+    'ECO-4': ('ECO4', 'ECO_4', 'ECO.4', 'ZONA-ECOLOGICA-4'),
+    
+    # Eixos e setores especiais
+    'EAC': ('E-AC', 'E_AC', 'EIXO-AC'),
+    'EACB': ('E-ACB', 'E_ACB', 'EIXO-ACB'),
+    'EACF': ('E-ACF', 'E_ACF', 'EIXO-ACF'),
+    'EMF': ('E-MF', 'E_MF', 'EIXO-MF'),
+    'EMLV': ('E-MLV', 'E_MLV', 'EIXO-MLV'),
+    'EE': ('E-E', 'E_E', 'EIXO-E'),
+    'ENC': ('E-NC', 'E_NC', 'EIXO-NC'),
+    
+    # Setores especiais
+    'SEHIS': ('SE-HIS', 'SE_HIS', 'SETOR-ESPECIAL-HIS'),
+    'SEPE': ('SE-PE', 'SE_PE', 'SETOR-ESPECIAL-PE'),
+    
+    # Outras zonas
+    'ZE': ('ZONA-ESPECIAL', 'Z-E', 'Z_E'),
+    'ZI': ('ZONA-INDUSTRIAL', 'Z-I', 'Z_I'),
+    'ZM': ('ZONA-MISTA', 'Z-M', 'Z_M'),
+    'ZT': ('ZONA-TRANSICAO', 'Z-T', 'Z_T'),
+    'ZPS': ('ZP-S', 'ZP_S', 'ZONA-PRESERVACAO-S'),
+}
+
+# Zona no formato prefixo + número (ZR4, ZS2, ZUM3, ECO1...)
+_ZONA_NUMERO_RE = re.compile(r'^([A-Z]+)(\d+)$')
+
+# Tabelas de tradução para normalizar nomes de zona em uma única passada
+_ESPACO_PARA_HIFEN = str.maketrans({' ': '-'})
+_REMOVE_SEPARADORES = str.maketrans('', '', '-_. ')
 
 class DocumentRetriever:
     """Retriever otimizado com busca híbrida"""
     
+    # Documentos com o mesmo início de conteúdo são considerados duplicados
+    PREFIXO_DEDUP = 500
+    
+    # Termos que indicam trechos com parâmetros urbanísticos (pontuação de relevância)
+    PALAVRAS_CHAVE = ('coeficiente', 'taxa', 'altura', 'recuo', 'afastamento')
+    
     def __init__(self, vectorstore, max_docs: int = 7):
         self.vectorstore = vectorstore
         self.max_docs = max_docs
     
     def search(self, zona: str, query_terms: List[str]) -> List[Document]:
         """Busca híbrida otimizada"""
-        print(f"DEBUG - Iniciando search() para zona: '{zona}'")
-        
-        # Garante que as variáveis são sempre definidas
-        zona_normalizada = zona  # Valor padrão seguro
-        zona_limpa = zona.upper().replace(" ", "-")  # Valor padrão seguro
-        
+        # Normaliza a zona usando o mapeamento
         try:
-            # Normaliza a zona usando o mapeamento
-            print(f"DEBUG - zona_normalizada inicializada: '{zona_normalizada}'")
-            
-            try:
-                from zona_mapping import normalizar_zona
-                zona_normalizada = normalizar_zona(zona)
-                print(f"DEBUG - Busca de documentos: '{zona}' -> normalizada: '{zona_normalizada}'")
-            except ImportError:
-                print(f"DEBUG - zona_mapping não encontrado, usando zona original: '{zona}'")
-                zona_normalizada = zona
-            except Exception as e:
-                print(f"DEBUG - Erro ao normalizar zona: {e}, usando zona original: '{zona}'")
-                zona_normalizada = zona
-            
-            print(f"DEBUG - Valor final de zona_normalizada: '{zona_normalizada}'")
-            zona_limpa = zona_normalizada.upper().replace(" ", "-")
-            print(f"DEBUG DocumentRetriever - Zona limpa para busca: '{zona_limpa}'")
-            
+            zona_normalizada = normalizar_zona(zona)
         except Exception as e:
-            print(f"DEBUG - Erro crítico na normalização: {e}")
-            # Garante valores seguros mesmo em caso de erro
+            logger.warning(f"Erro ao normalizar zona: {e}, usando zona original: '{zona}'")
             zona_normalizada = zona
-            zona_limpa = zona.upper().replace(" ", "-")
-        documentos = []
+        zona_limpa = zona_normalizada.upper().translate(_ESPACO_PARA_HIFEN)
+        logger.debug("Busca de documentos: '%s' -> zona limpa '%s'", zona, zona_limpa)
+        
+        # Acumulador deduplicado: prefixo do conteúdo -> documento (mantém a ordem de chegada)
+        documentos: Dict[str, Document] = {}
+        zona_exata_encontrada = False  # Algum trecho com metadado exatamente da zona buscada
         
         # Estratégia 1: Busca por filtros
         try:
             # Gerador robusto de variações para TODAS as zonas
             zona_variations = self._gerar_variacoes_zona(zona_limpa)
-            print(f"DEBUG - Variações da zona '{zona_limpa}': {zona_variations}")
+            logger.debug("Variações da zona '%s': %s", zona_limpa, zona_variations)
             
-            filtros = []
-            for zona_var in zona_variations:
-                filtros.extend([
-                    {'zona_especifica': zona_var},
-                    {'zona_especifica': zona_var.replace('-', '')},
-                    {'zona_especifica': zona_var.replace('.', '')},
-                    {'zonas_mencionadas': {'$in': [zona_var]}},
-                ])
-            print(f"DEBUG - Total filtros: {len(filtros)}")
+            # Todas as grafias em um único filtro: uma só consulta de metadados ao Chroma
+            valores_zona = sorted({
+                valor
+                for zona_var in zona_variations
+                for valor in (zona_var, zona_var.replace('-', ''), zona_var.replace('.', ''))
+            })
+            filtro = {'$or': [
+                {'zona_especifica': {'$in': valores_zona}},
+                {'zonas_mencionadas': {'$in': list(zona_variations)}},
+            ]}
+            # Mesmo teto de documentos da busca anterior (até 5 por filtro, 4 filtros por variação)
+            limite = 5 * 4 * len(zona_variations)
+            logger.debug("Total valores no filtro: %d", len(valores_zona))
             
-            for i, filtro in enumerate(filtros):
-                try:
-                    resultados = self.vectorstore.get(where=filtro, limit=5)
-                    docs_count = len(resultados.get('documents', [])) if resultados else 0
-                    print(f"DEBUG - Filtro {i+1}/{len(filtros)}: {filtro} -> {docs_count} docs")
-                    
-                    if resultados and resultados.get('documents'):
-                        docs = [
-                            Document(page_content=d, metadata=m) 
-                            for d, m in zip(resultados['documents'], resultados['metadatas'])
-                        ]
-                        documentos.extend(docs)
-                except Exception as e:
-                    print(f"DEBUG - Erro no filtro {filtro}: {e}")
-                    logger.warning(f"Erro no filtro {filtro}: {e}")
+            try:
+                lista_resultados = [self.vectorstore.get(where=filtro, limit=limite)]
+                if logger.isEnabledFor(logging.DEBUG):
+                    docs_count = len(lista_resultados[0].get('documents', [])) if lista_resultados[0] else 0
+                    logger.debug("Filtro combinado -> %d docs", docs_count)
+            except Exception as e:
+                # Backend sem suporte a $or/$in: filtros individuais, consultados em paralelo
+                logger.warning(f"Filtro combinado indisponível ({e}), usando filtros individuais")
+                lista_resultados = self._buscar_filtros_individuais(zona_variations)
+            
+            for resultados in lista_resultados:
+                if resultados and resultados.get('documents'):
+                    for d, m in zip(resultados['documents'], resultados['metadatas']):
+                        if m and m.get('zona_especifica') == zona_limpa:
+                            zona_exata_encontrada = True
+                        chave = d[:self.PREFIXO_DEDUP]  # O dict já faz o hash; sem risco de colisão
+                        if chave not in documentos:
+                            documentos[chave] = Document(page_content=d, metadata=m)
                     
         except Exception as e:
             logger.warning(f"Erro na busca por filtros: {e}")
         
-        # Estratégia 2: Busca semântica
-        if len(documentos) < 3:
+        # Estratégia 2: Busca semântica, só quando os metadados não bastam
+        # (poucos trechos e nenhum marcado exatamente com a zona buscada)
+        if len(documentos) < self.max_docs // 2 and not zona_exata_encontrada:
             try:
-                retriever = self.vectorstore.as_retriever(
-                    search_type="similarity", 
-                    search_kwargs={'k': 10}
-                )
-                
                 queries = [
                     f"tabela parâmetros {zona_limpa} coeficiente aproveitamento taxa ocupação",
                     f"{zona_limpa} altura recuos afastamentos",
                     f"zona {zona_limpa} uso ocupação solo"
                 ]
                 
-                docs_unicos = {hash(d.page_content) for d in documentos}
+                # Um único lote de embeddings para as três consultas
+                vetores = embed_textos_em_lote(self.vectorstore.embeddings, queries)
                 
-                for query in queries:
+                def buscar(query: str, vetor: List[float]) -> List[Document]:
                     try:
-                        docs = retriever.get_relevant_documents(query)
-                        for doc in docs:
-                            if zona_limpa.lower() in doc.page_content.lower():
-                                doc_hash = hash(doc.page_content)
-                                if doc_hash not in docs_unicos:
-                                    documentos.append(doc)
-                                    docs_unicos.add(doc_hash)
+                        return self.vectorstore.similarity_search_by_vector(vetor, k=10)
                     except Exception as e:
                         logger.warning(f"Erro na query '{query}': {e}")
+                        return []
+                
+                # Consultas ao índice em paralelo; resultados mantêm a ordem das queries
+                with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+                    resultados_semanticos = list(executor.map(buscar, queries, vetores))
+                
+                # Só trechos que citam a zona, sem diferenciar maiúsculas ($contains do Chroma diferencia)
+                zona_lower = zona_limpa.lower()
+                for docs in resultados_semanticos:
+                    for doc in docs:
+                        if zona_lower in doc.page_content.lower():
+                            documentos.setdefault(doc.page_content[:self.PREFIXO_DEDUP], doc)
                         
             except Exception as e:
                 logger.warning(f"Erro na busca semântica: {e}")
         
-        # Remover duplicatas e ordenar por relevância
-        docs_finais = self._remove_duplicates_and_rank(documentos, zona_limpa)
-        return docs_finais[:self.max_docs]
+        # Ordenar por relevância (duplicatas já descartadas na coleta)
+        return self._rank_documents(documentos.values(), zona_limpa)
+    
+    def _buscar_filtros_individuais(self, zona_variations: Tuple[str, ...]) -> List[Optional[Dict[str, Any]]]:
+        """Consulta um filtro simples por grafia da zona, em paralelo (resultados na ordem dos filtros)"""
+        # (campo, valor) sem repetição: grafias sem hífen/ponto geravam o mesmo filtro até 3 vezes
+        consultas = dict.fromkeys(
+            (campo, valor)
+            for zona_var in zona_variations
+            for campo, valor in (
+                ('zona_especifica', zona_var),
+                ('zona_especifica', zona_var.replace('-', '')),
+                ('zona_especifica', zona_var.replace('.', '')),
+                ('zonas_mencionadas', zona_var),
+            )
+        )
+        filtros = [
+            {campo: {'$in': [valor]}} if campo == 'zonas_mencionadas' else {campo: valor}
+            for campo, valor in consultas
+        ]
+        
+        def consultar(filtro):
+            try:
+                return self.vectorstore.get(where=filtro, limit=5)
+            except Exception as e:
+                logger.warning(f"Erro no filtro {filtro}: {e}")
+                return None
+        
+        # Consultas de metadados são limitadas por E/S (SQLite/HTTP)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            return list(executor.map(consultar, filtros))
     
-    def _gerar_variacoes_zona(self, zona: str) -> List[str]:
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _gerar_variacoes_zona(zona: str) -> Tuple[str, ...]:
         """
         Gera todas as variações possíveis de uma zona para busca robusta
         Baseado na análise das 39 zonas encontradas na base de dados
+        (resultado em cache: o conjunto de zonas é pequeno e fixo)
         """
-        import re
-        
         variacoes = set([zona])  # Sempre inclui a zona original
         
         # Padrões identificados na base:
@@ -930,7 +1369,7 @@ class DocumentRetriever:
         else:
             # ZR4 → ZR-4
             # Procura padrões como ZR4, ZS2, ZUM3, ECO1, etc.
-            match = re.match(r'^([A-Z]+)(\d+)$', zona)
+            match = _ZONA_NUMERO_RE.match(zona)
             if match:
                 prefixo, numero = match.groups()
                 variacoes.add(f"{prefixo}-{numero}")
@@ -956,74 +1395,12 @@ class DocumentRetriever:
                     variacoes.add(f"{zona}-{i}")
         
         # 3. Variações especiais conhecidas
-        especiais = {
-            # Zonas residenciais
-            'ZR1': ['ZR-1', 'ZR_1', 'ZR.1', 'ZONA-RESIDENCIAL-1'],
-            'ZR2': ['ZR-2', 'ZR_2', 'ZR.2', 'ZONA-RESIDENCIAL-2'],
-            'ZR3': ['ZR-3', 'ZR_3', 'ZR.3', 'ZONA-RESIDENCIAL-3'],
-            'ZR-4': ['ZR4', 'ZR_4', 'ZR.4', 'ZONA-RESIDENCIAL-4'],
-            'ZR3-T': ['ZR3T', 'ZR3_T', 'ZR-3-T', 'ZR-3T'],
-            'ZROC': ['ZR-OC', 'ZR_OC', 'ZONA-RESIDENCIAL-OC'],
-            'ZROI': ['ZR-OI', 'ZR_OI', 'ZONA-RESIDENCIAL-OI'],
-            
-            # Zona Centro Cívico (caso especial!)
-            'ZCC.4': ['ZCC', 'ZCC4', 'ZCC-4', 'ZCC_4', 'ZONA-CENTRO-CIVICO'],
-            'ZCC': ['ZCC.4', 'ZCC4', 'ZCC-4', 'ZCC_4', 'ZONA-CENTRO-CIVICO'],
-            
-            # Zonas centrais
-            'ZC': ['ZONA-CENTRAL', 'CENTRO'],
-            'ZCSF': ['ZC-SF', 'ZC_SF', 'ZONA-CENTRAL-SF'],
-            'ZCUM': ['ZC-UM', 'ZC_UM', 'ZONA-CENTRAL-UM'],
-            
-            # Zonas de serviço
-            'ZS-1': ['ZS1', 'ZS_1', 'ZS.1', 'ZONA-SERVICOS-1'],
-            'ZS-2': ['ZS2', 'ZS_2', 'ZS.2', 'ZONA-SERVICOS-2'],
-            'ZSF': ['ZS-F', 'ZS_F', 'ZONA-SERVICOS-F'],
-            'ZSM': ['ZS-M', 'ZS_M', 'ZONA-SERVICOS-M'],
-            
-            # Zonas de uso misto
-            'ZUM-1': ['ZUM1', 'ZUM_1', 'ZUM.1', 'ZONA-USO-MISTO-1'],
-            'ZUM-2': ['ZUM2', 'ZUM_2', 'ZUM.2', 'ZONA-USO-MISTO-2'],
-            'ZUM-3': ['ZUM3', 'ZUM_3', 'ZUM.3', 'ZONA-USO-MISTO-3'],
-            'ZUMVP': ['ZUM-VP', 'ZUM_VP', 'ZONA-USO-MISTO-VP'],
-            
-            # Zonas habitacionais
-            'ZH-1': ['ZH1', 'ZH_1', 'ZH.1', 'ZONA-HABITACIONAL-1'],
-            'ZH-2': ['ZH2', 'ZH_2', 'ZH.2', 'ZONA-HABITACIONAL-2'],
-            
-            # Zonas ecológicas
-            'ECO-1': ['ECO1', 'ECO_1', 'ECO.1', 'ZONA-ECOLOGICA-1'],
-            'ECO-2': ['ECO2', 'ECO_2', 'ECO.2', 'ZONA-ECOLOGICA-2'],
-            'ECO-3': ['ECO3', 'ECO_3', 'ECO.3', 'ZONA-ECOLOGICA-3'],
-            'ECO-4': ['ECO4', 'ECO_4', 'ECO.4', 'ZONA-ECOLOGICA-4'],
-            
-            # Eixos e setores especiais
-            'EAC': ['E-AC', 'E_AC', 'EIXO-AC'],
-            'EACB': ['E-ACB', 'E_ACB', 'EIXO-ACB'],
-            'EACF': ['E-ACF', 'E_ACF', 'EIXO-ACF'],
-            'EMF': ['E-MF', 'E_MF', 'EIXO-MF'],
-            'EMLV': ['E-MLV', 'E_MLV', 'EIXO-MLV'],
-            'EE': ['E-E', 'E_E', 'EIXO-E'],
-            'ENC': ['E-NC', 'E_NC', 'EIXO-NC'],
-            
-            # Setores especiais
-            'SEHIS': ['SE-HIS', 'SE_HIS', 'SETOR-ESPECIAL-HIS'],
-            'SEPE': ['SE-PE', 'SE_PE', 'SETOR-ESPECIAL-PE'],
-            
-            # Outras zonas
-            'ZE': ['ZONA-ESPECIAL', 'Z-E', 'Z_E'],
-            'ZI': ['ZONA-INDUSTRIAL', 'Z-I', 'Z_I'],
-            'ZM': ['ZONA-MISTA', 'Z-M', 'Z_M'],
-            'ZT': ['ZONA-TRANSICAO', 'Z-T', 'Z_T'],
-            'ZPS': ['ZP-S', 'ZP_S', 'ZONA-PRESERVACAO-S'],
-        }
-        
-        if zona in especiais:
-            variacoes.update(especiais[zona])
+        if zona in _VARIACOES_ESPECIAIS:
+            variacoes.update(_VARIACOES_ESPECIAIS[zona])
         
         # 4. Variações genéricas adicionais
         # Remove espaços, underscores, hífens
-        base_limpa = zona.replace('-', '').replace('_', '').replace('.', '').replace(' ', '')
+        base_limpa = zona.translate(_REMOVE_SEPARADORES)
         variacoes.add(base_limpa)
         
         # Adiciona versões com espaços
@@ -1034,34 +1411,26 @@ class DocumentRetriever:
         if '.' in zona:
             variacoes.add(zona.replace('.', ' '))
         
-        # Converte para lista e remove duplicatas
-        lista_final = sorted(list(variacoes))
+        # Ordena e congela (tupla imutável pode ser compartilhada pelo cache)
+        lista_final = tuple(sorted(variacoes))
         
-        print(f"DEBUG _gerar_variacoes_zona - '{zona}' gerou {len(lista_final)} variações")
+        logger.debug("_gerar_variacoes_zona - '%s' gerou %d variações", zona, len(lista_final))
         
         return lista_final
     
-    def _remove_duplicates_and_rank(self, docs: List[Document], zona: str) -> List[Document]:
-        """Remove duplicatas e ordena por relevância"""
-        docs_unicos = []
-        conteudos_vistos = set()
+    def _rank_documents(self, docs: Iterable[Document], zona: str) -> List[Document]:
+        """Os max_docs documentos (já deduplicados) mais relevantes, em ordem de relevância"""
+        zona_lower = zona.lower()
         
-        for doc in docs:
-            conteudo_hash = hash(doc.page_content[:500])  # Hash dos primeiros 500 chars
-            if conteudo_hash not in conteudos_vistos:
-                conteudos_vistos.add(conteudo_hash)
-                docs_unicos.append(doc)
-        
-        # Ordenar por relevância
         def score_relevance(doc):
             score = 0
-            content = doc.page_content.upper()
+            content = doc.page_content.lower()  # Uma única cópia em minúsculas por documento
             meta = doc.metadata
             
             # Pontuação por zona específica
             if meta.get('zona_especifica') == zona:
                 score += 10
-            elif zona in content:
+            elif zona_lower in content:
                 score += 5
             
             # Pontuação por tipo de conteúdo
@@ -1071,13 +1440,87 @@ class DocumentRetriever:
                 score += 4
             
             # Pontuação por densidade de informação relevante
-            palavras_chave = ['coeficiente', 'taxa', 'altura', 'recuo', 'afastamento']
-            score += sum(2 for palavra in palavras_chave if palavra in content.lower())
+            score += sum(2 for palavra in self.PALAVRAS_CHAVE if palavra in content)
             
             return score
         
-        docs_unicos.sort(key=score_relevance, reverse=True)
-        return docs_unicos
+        # Equivale a sorted(..., reverse=True)[:max_docs], inclusive na ordem dos empates
+        return heapq.nlargest(self.max_docs, docs, key=score_relevance)
+
+class AnswerCache:
+    """Cache persistente (SQLite) de respostas do LLM"""
+    
+    def __init__(self, cache_file: pathlib.Path, max_entries: int = 500):
+        self.cache_file = cache_file
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(cache_file), check_same_thread=False)
+        with self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS respostas (chave TEXT PRIMARY KEY, resposta TEXT NOT NULL)")
+    
+    @staticmethod
+    def make_key(documents: List[Document], query: str, data_analise: str) -> str:
+        """Chave exata: modelo, prompt, pergunta (espaços normalizados), contexto e data do relatório"""
+        h = hashlib.sha256()
+        # Trocar o modelo ou o prompt invalida os relatórios já guardados
+        partes = (CONFIG.MODELO_LLM, ReportGenerator.TEMPLATE, data_analise,
+                  " ".join(query.split()), *(d.page_content for d in documents))
+        for parte in partes:
+            h.update(parte.encode('utf-8'))
+            h.update(b"\x00")
+        return h.hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        try:
+            with self._lock:
+                linha = self._conn.execute("SELECT resposta FROM respostas WHERE chave = ?", (key,)).fetchone()
+        except Exception as e:
+            logger.warning(f"Erro ao ler cache de respostas: {e}")
+            return None
+        return linha[0] if linha else None
+    
+    def set(self, key: str, answer: str):
+        # Uma linha por resposta, em transação: sem regravar o cache inteiro nem arquivo corrompido
+        try:
+            with self._lock, self._conn:
+                self._conn.execute("INSERT OR REPLACE INTO respostas (chave, resposta) VALUES (?, ?)", (key, answer))
+                # Descarta as entradas mais antigas (rowid crescente) acima do limite
+                excesso = self._conn.execute("SELECT COUNT(*) FROM respostas").fetchone()[0] - self.max_entries
+                if excesso > 0:
+                    self._conn.execute(
+                        "DELETE FROM respostas WHERE rowid IN (SELECT rowid FROM respostas ORDER BY rowid LIMIT ?)",
+                        (excesso,)
+                    )
+        except Exception as e:
+            logger.warning(f"Erro ao salvar cache de respostas: {e}")
+
+@st.cache_resource(show_spinner=False)
+def _get_answer_cache() -> Optional[AnswerCache]:
+    """Cache de respostas do LLM, aberto no primeiro uso; None (sem cache) se o SQLite falhar"""
+    try:
+        return AnswerCache(CONFIG.PASTA_CACHE / "answer_cache.sqlite")
+    except Exception as e:
+        logger.warning(f"Cache de respostas indisponível: {e}")
+        return None
+
+# Chains de QA por LLM: id(llm) -> (llm, chain). A referência ao LLM impede a reutilização do id.
+_qa_chain_cache: Dict[int, Tuple[Any, Any]] = {}
+_qa_chain_lock = threading.Lock()
+
+def _get_qa_chain(llm, prompt, max_chains: int = 8):
+    """Reaproveita a chain de QA já montada para o mesmo LLM"""
+    with _qa_chain_lock:
+        cached = _qa_chain_cache.get(id(llm))
+        if cached is not None and cached[0] is llm:
+            return cached[1]
+        
+        from langchain.chains.question_answering import load_qa_chain  # Import tardio (pesado)
+        chain = load_qa_chain(llm, chain_type="stuff", prompt=prompt)
+        while len(_qa_chain_cache) >= max_chains:
+            _qa_chain_cache.pop(next(iter(_qa_chain_cache)))
+        _qa_chain_cache[id(llm)] = (llm, chain)
+        return chain
 
 class ReportGenerator:
     """Gerador otimizado de relatórios"""
@@ -1140,50 +1583,139 @@ class ReportGenerator:
     [Ajustes necessários ou "Nenhuma recomendação necessária"]
     """
     
+    # Prompt montado uma única vez, na definição da classe
+    PROMPT = PromptTemplate(
+        template=TEMPLATE,
+        input_variables=["context", "question", "data_analise"]
+    )
+    
     def __init__(self, llm):
         self.llm = llm
-        self.prompt = PromptTemplate(
-            template=self.TEMPLATE,
-            input_variables=["context", "question", "data_analise"]
-        )
-        self.chain = load_qa_chain(llm, chain_type="stuff", prompt=self.prompt)
+        self.prompt = self.PROMPT
+        self.chain = _get_qa_chain(llm, self.PROMPT)
     
     def generate(self, documents: List[Document], query: str) -> str:
         """Gera relatório com retry automático"""
         max_retries = 3
+        data_analise = datetime.now().strftime("%d/%m/%Y")
+        
+        answer_cache = _get_answer_cache()
+        if answer_cache is not None:
+            cache_key = answer_cache.make_key(documents, query, data_analise)
+            cached = answer_cache.get(cache_key)
+            if cached is not None:
+                logger.info("Relatório servido pelo cache de respostas")
+                return cached
         
         for attempt in range(max_retries):
             try:
                 resultado = self.chain.invoke({
                     "input_documents": documents,
                     "question": query,
-                    "data_analise": datetime.now().strftime("%d/%m/%Y")
+                    "data_analise": data_analise
                 }, return_only_outputs=True)
                 
+                if answer_cache is not None:
+                    answer_cache.set(cache_key, resultado['output_text'])
                 return resultado['output_text']
                 
             except Exception as e:
                 logger.warning(f"Tentativa {attempt + 1} falhou: {e}")
                 if attempt == max_retries - 1:
                     raise
-                time.sleep(2 ** attempt)  # Backoff exponencial
+                # Backoff exponencial com jitter: sessões que falharam juntas não repetem juntas
+                time.sleep(random.uniform(0.5, min(8.0, 2 ** (attempt + 1))))
+
+# Valores padrão dos parâmetros avançados do formulário (sem seção extra na query quando todos coincidem)
+_PARAMETROS_AVANCADOS_PADRAO = MappingProxyType({
+    'altura_personalizada_pav': 3.0,
+    'incluir_atico': False,
+    'incluir_varandas': False,
+    'pavimento_permeavel': False,
+    'tipo_recuo': 'Recuos mínimos',
+    'considerar_marquises': False,
+})
+
+@lru_cache(maxsize=128)
+def _rotulo_parametro(param_name: str) -> str:
+    """Nome de exibição do parâmetro (vocabulário fixo, calculado uma vez por nome)"""
+    return param_name.replace('_', ' ').title()
+
+# Executor compartilhado: trabalho de CPU que corre em paralelo à E/S da análise
+_analysis_executor = ThreadPoolExecutor(max_workers=CONFIG.MAX_WORKERS, thread_name_prefix="analise")
+
+# Parâmetros oficiais estruturados ({'valor': ...}) na ordem em que entram na query
+_ROTULOS_PARAMETROS_OFICIAIS: Tuple[Tuple[str, str], ...] = (
+    ('taxa_ocupacao', 'Taxa de Ocupação'),
+    ('coeficiente_aproveitamento', 'Coeficiente de Aproveitamento'),
+    ('altura_pavimentos', 'Altura/Pavimentos'),
+    ('taxa_permeavel', 'Taxa Permeável'),
+    ('recuo_frontal', 'Recuo Frontal'),
+    ('afastamento_divisas', 'Afastamento Divisas'),
+    ('lote_padrao', 'Lote Padrão'),
+)
 
 class AnalysisEngine:
     """Engine principal de análise"""
     
+    MAX_RESULTADOS_CACHE = 64
+    
     def __init__(self):
         self.extractor = ParameterExtractor()
+        # LRU de análises; a engine é compartilhada entre sessões, daí o lock
+        self._cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+    
+    @staticmethod
+    def _chave_analise(cidade: str, endereco: str, memorial: str, zona_manual: Optional[str],
+                       usar_zona_manual: bool, parametros_avancados: Optional[dict],
+                       dados_formulario: Optional[dict]) -> bytes:
+        """Chave das entradas mais o estado que altera o resultado: data, versão dos JSON de zona, modelo e prompt"""
+        assinatura_zonas = _assinatura_arquivos(ZoneDataManager.ARQUIVO_ZONAS, ZoneDataManager.ARQUIVO_OCUPACAO)
+        entradas = json.dumps(
+            [datetime.now().strftime("%d/%m/%Y"), assinatura_zonas, CONFIG.MODELO_LLM, ReportGenerator.TEMPLATE,
+             cidade, endereco, memorial, zona_manual, usar_zona_manual,
+             parametros_avancados or {}, dados_formulario or {}],
+            sort_keys=True, default=str, ensure_ascii=False
+        )
+        return hashlib.blake2b(entradas.encode('utf-8'), digest_size=16).digest()
     
     def run_analysis(self, cidade: str, endereco: str, memorial: str, 
                      zona_manual: Optional[str] = None, usar_zona_manual: bool = False,
                      parametros_avancados: dict = None, dados_formulario: dict = None) -> Dict[str, Any]:
-        """Execução otimizada da análise"""
-        
+        """Execução otimizada da análise (entradas idênticas reaproveitam o resultado anterior)"""
+        chave = self._chave_analise(cidade, endereco, memorial, zona_manual, usar_zona_manual,
+                                    parametros_avancados, dados_formulario)
+        with self._cache_lock:
+            resultado = self._cache.get(chave)
+            if resultado is not None:
+                self._cache.move_to_end(chave)
+        if resultado is not None:
+            logger.info("Análise servida pelo cache de resultados")
+            return dict(resultado)  # Cópia rasa: o chamador acrescenta chaves ao resultado
+        
+        # Falhas propagam a exceção e não entram no cache
+        resultado = self._executar_analise(cidade, endereco, memorial, zona_manual, usar_zona_manual,
+                                           parametros_avancados, dados_formulario)
+        with self._cache_lock:
+            self._cache[chave] = resultado
+            if len(self._cache) > self.MAX_RESULTADOS_CACHE:
+                self._cache.popitem(last=False)
+        return dict(resultado)
+    
+    def _executar_analise(self, cidade: str, endereco: str, memorial: str,
+                          zona_manual: Optional[str], usar_zona_manual: bool,
+                          parametros_avancados: Optional[dict], dados_formulario: Optional[dict]) -> Dict[str, Any]:
         try:
-            # 1. Carregar recursos
-            resources = resource_manager.get_resources(cidade)
+            # Extração do memorial não depende de recursos nem da zona: roda em paralelo
+            # ao carregamento de recursos e à detecção GIS (ambos limitados por E/S)
+            parametros_future = _analysis_executor.submit(self.extractor.extract, memorial)
+            
+            # 1. Carregar recursos (Chroma + LLM) enquanto a zona é detectada
+            resources_future = _analysis_executor.submit(resource_manager.get_resources, cidade)
             
             # 2. Identificar zona com sistema GIS profissional
+            aviso_deteccao = None  # Renderizado pela interface junto com o resultado
             if usar_zona_manual and zona_manual:
                 zona = zona_manual
                 zona_info = f"{zona} (INFORMADA MANUALMENTE)"
@@ -1205,58 +1737,61 @@ class AnalysisEngine:
                     zona_info = f"{zona} (ZONA PADRÃO)"
                     detection_details = f"Zona padrão utilizada: {detection_result.details}"
                 
-                print(f"DEBUG GIS - Zona detectada: {zona} | Confiança: {detection_result.confidence} | Fonte: {detection_result.source}")
-                if detection_result.coordinates:
-                    print(f"DEBUG GIS - Coordenadas: {detection_result.coordinates}")
+                logger.debug("GIS - Zona detectada: %s | Confiança: %s | Fonte: %s | Coordenadas: %s",
+                             zona, detection_result.confidence, detection_result.source,
+                             detection_result.coordinates)
                     
-                # Mostrar informação compacta de detecção
-                st.info(f"🎯 **Zona detectada**: {zona} via {detection_result.source} (confiança: {detection_result.confidence})")
+                # Informação compacta de detecção
+                aviso_deteccao = f"🎯 **Zona detectada**: {zona} via {detection_result.source} (confiança: {detection_result.confidence})"
             
             # Salvar informações de detecção para uso posterior
             zona_detection_info = zona_info
             zona_detection_details = detection_details
             
             # Enriquecer com parâmetros oficiais de zoneamento usando ZoneDataManager
-            zone_data = zone_data_manager.get_zone_data(zona)
-            zone_limits = zone_data_manager.get_parameter_limits(zona)
+            # A engine fica em cache entre reruns: busca o gerenciador atual em vez do global
+            # capturado na primeira execução, para que JSON alterados sejam recarregados
+            zone_manager = _zone_data_manager_atual()
+            zone_resolution = zone_manager.resolve(zona)
+            zone_data = zone_resolution.zone_data
+            zone_limits = zone_resolution.limits
             
             if zone_data:
                 zona_params_oficiais = zone_data
                 zona_info += f" - DADOS OFICIAIS CARREGADOS ({len(zone_limits)} parâmetros)"
-                print(f"DEBUG ZONEAMENTO - Dados oficiais carregados para {zona}: {list(zone_limits.keys())}")
+                logger.debug("Zoneamento - Dados oficiais carregados para %s: %s", zona, list(zone_limits))
                 
                 # Adicionar resumo da zona aos detalhes
-                zone_summary = zone_data_manager.get_zone_summary(zona)
+                zone_summary = zone_manager.get_zone_summary(zona)
                 zona_detection_details += f"\n\nDados Oficiais da Zona:\n{zone_summary}"
             else:
                 zona_params_oficiais = {}
                 zona_info += f" - DADOS OFICIAIS NÃO ENCONTRADOS"
-                print(f"DEBUG ZONEAMENTO - Nenhum dado oficial encontrado para {zona}")
-                
                 # Sistema de fallback removido - usando apenas dados oficiais do ZoneDataManager
-                print(f"DEBUG ZONEAMENTO - Sistema de fallback obsoleto removido para {zona}")
+                logger.debug("Zoneamento - Nenhum dado oficial encontrado para %s", zona)
             
             # Validação com parâmetros da zona detectada pelo sistema robusto
             validacoes_robustas = []
             if dados_formulario and dados_formulario.get('zona_parametros'):
                 zona_parametros = dados_formulario['zona_parametros']
                 validacoes_robustas = self._validar_conformidade_robusta(dados_formulario, zona_parametros)
-                print(f"DEBUG ROBUST - Validações realizadas: {len(validacoes_robustas)} itens")
+                logger.debug("Validações robustas realizadas: %d itens", len(validacoes_robustas))
             
-            # 3. Extrair parâmetros
-            parametros = self.extractor.extract(memorial)
+            # 3. Extrair parâmetros (iniciado no começo da análise)
+            parametros = parametros_future.result()
             
             # 4. Buscar documentos
-            retriever = DocumentRetriever(resources["vectorstore"])
+            resources = resources_future.result()
+            retriever = resources["retriever"]
             documentos = retriever.search(zona, list(parametros.keys()))
             
-            print(f"DEBUG DocumentRetriever - Total documentos encontrados: {len(documentos)}")
-            for i, doc in enumerate(documentos[:3]):  # Mostra apenas os 3 primeiros
-                print(f"DEBUG Doc {i+1} metadata: {doc.metadata}")
-                print(f"DEBUG Doc {i+1} content preview: {doc.page_content[:200]}...")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("DocumentRetriever - Total documentos encontrados: %d", len(documentos))
+                for i, doc in enumerate(documentos[:3], 1):  # Mostra apenas os 3 primeiros
+                    logger.debug("Doc %d metadata: %s | início: %s...", i, doc.metadata, doc.page_content[:200])
             
             if not documentos:
-                print(f"DEBUG - Busca falhou para zona: {zona}")
+                logger.debug("Busca sem resultados para a zona %s", zona)
                 vectorstore = resources["vectorstore"]
                 
                 # Check if vectorstore is completely unavailable (neither ChromaDB nor fallback)
@@ -1265,7 +1800,7 @@ class AnalysisEngine:
                 
                 # If vectorstore is available but no documents found, provide helpful message
                 if hasattr(vectorstore, 'fallback_retriever') and vectorstore.fallback_retriever:
-                    print("DEBUG - Using fallback retriever, checking available zones...")
+                    logger.debug("Consultando zonas disponíveis no retriever de fallback")
                     # Get a sample of available zones from fallback data
                     sample_docs = vectorstore.fallback_retriever.get(limit=10)
                     available_zones = set()
@@ -1283,7 +1818,7 @@ class AnalysisEngine:
             
             # 5. Gerar relatório
             generator = ReportGenerator(resources["llm"])
-            query = self._build_query(endereco, cidade, zona, memorial, parametros, zona_params_oficiais, parametros_avancados)
+            query = self._build_query(endereco, cidade, zona, memorial, parametros, zona_params_oficiais, parametros_avancados, zone_limits)
             relatorio = generator.generate(documentos, query)
             
             return {
@@ -1293,6 +1828,7 @@ class AnalysisEngine:
                 'zona': zona,
                 'zona_info': zona_detection_info,
                 'zona_detection_details': zona_detection_details,
+                'aviso_deteccao': aviso_deteccao,
                 'parametros': parametros,
                 'validacoes_robustas': validacoes_robustas,
                 'info_projeto': {
@@ -1308,9 +1844,9 @@ class AnalysisEngine:
             logger.error(f"Erro na análise: {e}")
             raise
     
-    def _build_query(self, endereco: str, cidade: str, zona: str, memorial: str, parametros: dict = None, zona_params_oficiais: dict = None, parametros_avancados: dict = None) -> str:
+    def _build_query(self, endereco: str, cidade: str, zona: str, memorial: str, parametros: dict = None, zona_params_oficiais: dict = None, parametros_avancados: dict = None, zone_limits: Mapping[str, ParameterLimit] = None) -> str:
         """Constrói query otimizada"""
-        query = f"""
+        partes: List[str] = [f"""
         DADOS DO PROJETO:
         - Endereço: {endereco}
         - Município: {cidade.capitalize()}
@@ -1318,7 +1854,7 @@ class AnalysisEngine:
         
         MEMORIAL DESCRITIVO:
         {memorial}
-        """
+        """]
         
         # Adiciona informações de conversão de altura se disponível
         if parametros and parametros.get('altura_edificacao') is not None:
@@ -1337,44 +1873,27 @@ class AnalysisEngine:
             altura_m = altura_m if altura_m is not None else 0.0
             altura_pav = altura_pav if altura_pav is not None else 0.0
             
-            query += f"""
+            partes.append(f"""
         
         INFORMAÇÕES ADICIONAIS SOBRE ALTURA:
         - Altura informada no memorial: {parametros['altura_edificacao']} {unidade_orig}{atico_info}
         - Equivalência: {altura_m:.1f} metros = {altura_pav:.1f} pavimentos
         - Conversão baseada em altura personalizada: 1 pavimento = {altura_pav_personalizada:.1f} metros
-        """
+        """)
         
         # Adicionar dados oficiais da zona usando o novo formato estruturado
         if zona_params_oficiais:
-            query += f"""
+            partes.append(f"""
         
         DADOS OFICIAIS DA ZONA {zona}:
-        """
+        """)
             
             # Processar parâmetros estruturados
-            params_formatados = []
-            
-            if zona_params_oficiais.get('taxa_ocupacao', {}).get('valor'):
-                params_formatados.append(f"- Taxa de Ocupação: {zona_params_oficiais['taxa_ocupacao']['valor']}")
-                
-            if zona_params_oficiais.get('coeficiente_aproveitamento', {}).get('valor'):
-                params_formatados.append(f"- Coeficiente de Aproveitamento: {zona_params_oficiais['coeficiente_aproveitamento']['valor']}")
-                
-            if zona_params_oficiais.get('altura_pavimentos', {}).get('valor'):
-                params_formatados.append(f"- Altura/Pavimentos: {zona_params_oficiais['altura_pavimentos']['valor']}")
-                
-            if zona_params_oficiais.get('taxa_permeavel', {}).get('valor'):
-                params_formatados.append(f"- Taxa Permeável: {zona_params_oficiais['taxa_permeavel']['valor']}")
-                
-            if zona_params_oficiais.get('recuo_frontal', {}).get('valor'):
-                params_formatados.append(f"- Recuo Frontal: {zona_params_oficiais['recuo_frontal']['valor']}")
-                
-            if zona_params_oficiais.get('afastamento_divisas', {}).get('valor'):
-                params_formatados.append(f"- Afastamento Divisas: {zona_params_oficiais['afastamento_divisas']['valor']}")
-                
-            if zona_params_oficiais.get('lote_padrao', {}).get('valor'):
-                params_formatados.append(f"- Lote Padrão: {zona_params_oficiais['lote_padrao']['valor']}")
+            params_formatados = [
+                f"- {rotulo}: {param['valor']}"
+                for chave, rotulo in _ROTULOS_PARAMETROS_OFICIAIS
+                if (param := zona_params_oficiais.get(chave)) and param.get('valor')
+            ]
                 
             if zona_params_oficiais.get('usos_permitidos'):
                 params_formatados.append(f"- Usos Permitidos: {zona_params_oficiais['usos_permitidos']}")
@@ -1382,20 +1901,23 @@ class AnalysisEngine:
             if zona_params_oficiais.get('notas_tecnicas'):
                 params_formatados.append(f"- Notas Técnicas: {zona_params_oficiais['notas_tecnicas']}")
             
-            query += "\n".join(params_formatados)
+            partes.append("\n".join(params_formatados))
             
             # Adicionar informações sobre limites específicos obtidos do ZoneDataManager
-            zone_limits = zone_data_manager.get_parameter_limits(zona)
+            if zone_limits is None:
+                zone_limits = _zone_data_manager_atual().get_parameter_limits(zona)
             if zone_limits:
-                query += f"""
+                partes.append(f"""
         
         LIMITES ESPECÍFICOS EXTRAÍDOS:
-        """
-                for param_name, limit in zone_limits.items():
-                    if limit.min_value is not None or limit.max_value is not None:
-                        query += f"- {param_name.replace('_', ' ').title()}: {limit.get_limit_display()}\n"
+        """)
+                partes.append("".join([
+                    f"- {_rotulo_parametro(param_name)}: {limit.get_limit_display()}\n"
+                    for param_name, limit in zone_limits.items()
+                    if limit.min_value is not None or limit.max_value is not None
+                ]))
         
-        query += f"""
+        partes.append(f"""
         
         TAREFA ESPECÍFICA: 
         Analise cada parâmetro identificando se a legislação da zona {zona} estabelece:
@@ -1411,26 +1933,34 @@ class AnalysisEngine:
         
         Use os PARÂMETROS OFICIAIS DA ZONA listados acima como referência principal, mas também
         analise os documentos de contexto para identificar limites mínimos e máximos específicos.
-        """
-        
-        # Adicionar informações sobre parâmetros específicos avançados se disponíveis
-        if parametros_avancados:
-            query += f"""
+        """)
+        
+        # Adicionar informações sobre parâmetros específicos avançados se diferentes do padrão
+        if parametros_avancados and any(
+            parametros_avancados.get(chave, padrao) != padrao
+            for chave, padrao in _PARAMETROS_AVANCADOS_PADRAO.items()
+        ):
+            incluir_varandas = parametros_avancados.get('incluir_varandas', False)
+            pavimento_permeavel = parametros_avancados.get('pavimento_permeavel', False)
+            considerar_marquises = parametros_avancados.get('considerar_marquises', False)
+            tipo_recuo = parametros_avancados.get('tipo_recuo', 'Recuos mínimos')
+            partes.append(f"""
         
         PARÂMETROS ESPECÍFICOS DE ANÁLISE:
         - Altura por pavimento personalizada: {parametros_avancados.get('altura_personalizada_pav', 3.0):.1f}m
         - Incluir ático/cobertura: {'Sim' if parametros_avancados.get('incluir_atico', False) else 'Não'}
-        - Considerar varandas descobertas: {'Sim' if parametros_avancados.get('incluir_varandas', False) else 'Não'}
-        - Considerar pavimento permeável: {'Sim' if parametros_avancados.get('pavimento_permeavel', False) else 'Não'}
-        - Tipo de recuo: {parametros_avancados.get('tipo_recuo', 'Recuos mínimos')}
-        - Considerar marquises/beirais: {'Sim' if parametros_avancados.get('considerar_marquises', False) else 'Não'}
+        - Considerar varandas descobertas: {'Sim' if incluir_varandas else 'Não'}
+        - Considerar pavimento permeável: {'Sim' if pavimento_permeavel else 'Não'}
+        - Tipo de recuo: {tipo_recuo}
+        - Considerar marquises/beirais: {'Sim' if considerar_marquises else 'Não'}
         
         INSTRUÇÕES ESPECÍFICAS:
-        - Para área permeável: {'incluir varandas descobertas e ' if parametros_avancados.get('incluir_varandas', False) else ''}{'considerar pavimentos permeáveis' if parametros_avancados.get('pavimento_permeavel', False) else 'usar critérios padrão'}
-        - Para recuos: usar {'valores mínimos obrigatórios' if parametros_avancados.get('tipo_recuo') == 'Recuos obrigatórios' else 'valores mínimos recomendados'}{' e considerar marquises/beirais nos cálculos' if parametros_avancados.get('considerar_marquises', False) else ''}
-        """
+        - Para área permeável: {'incluir varandas descobertas e ' if incluir_varandas else ''}{'considerar pavimentos permeáveis' if pavimento_permeavel else 'usar critérios padrão'}
+        - Para recuos: usar {'valores mínimos obrigatórios' if tipo_recuo == 'Recuos obrigatórios' else 'valores mínimos recomendados'}{' e considerar marquises/beirais nos cálculos' if considerar_marquises else ''}
+        """)
         
-        return query
+        # Concatenação única no final (evita realocar a string a cada +=)
+        return "".join(partes)
     
     def _validar_conformidade_robusta(self, dados_formulario: dict, zona_parametros) -> List[Dict[str, Any]]:
         """Validação detalhada com parâmetros da zona detectada pelo sistema robusto"""
@@ -1535,17 +2065,9 @@ class AnalysisEngine:
         return validacoes
 
 # UI Functions (otimizadas)
-def configurar_pagina():
-    """Configuração otimizada da página"""
-    st.set_page_config(
-        page_title="Assistente Regulatório v6.0",
-        page_icon="🏗️",
-        layout="wide",
-        initial_sidebar_state="expanded"
-    )
-    
-    # CSS básico para estilos
-    st.markdown("""
+
+# CSS básico para estilos (constante de módulo, montada uma única vez)
+_PAGINA_CSS = """
     <style>
         /* Aumentar largura da sidebar para desktop (tela >= 768px) */
         @media (min-width: 768px) {
@@ -1604,22 +2126,129 @@ def configurar_pagina():
             }
         }
     </style>
-    """, unsafe_allow_html=True)
+    """
+
+def configurar_pagina():
+    """Configuração otimizada da página"""
+    st.set_page_config(
+        page_title="Assistente Regulatório v6.0",
+        page_icon="🏗️",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    
+    st.markdown(_PAGINA_CSS, unsafe_allow_html=True)
 
-@lru_cache(maxsize=10)
+@st.cache_data(ttl=300, show_spinner=False)
 def get_cidades_disponiveis():
-    """Cache das cidades disponíveis"""
+    """Cache das cidades disponíveis (compartilhado entre sessões, renovado a cada 5 min)"""
     return [d.name for d in CONFIG.PASTA_DADOS_RAIZ.iterdir() if d.is_dir()]
 
+@st.cache_data(max_entries=32, show_spinner=False)
+def _extrair_texto_pdf_bytes(dados: bytes) -> str:
+    """Extrai o texto do PDF; cacheado pelo hash dos bytes (reruns do Streamlit não reprocessam)"""
+    if fitz is not None:
+        # Extração sequencial: o MuPDF não suporta uso concorrente a partir de várias threads
+        with fitz.open(stream=dados, filetype="pdf") as documento:
+            return "\n".join([pagina.get_text("text") for pagina in documento])
+    leitor = pypdf.PdfReader(io.BytesIO(dados))
+    return "\n".join([pagina.extract_text() for pagina in leitor.pages])
+
 def extrair_texto_pdf(arquivo):
-    """Extração otimizada de PDF"""
+    """Extração otimizada de PDF (aceita bytes ou o arquivo enviado pelo Streamlit)"""
     try:
-        leitor = pypdf.PdfReader(arquivo)
-        return "".join(pagina.extract_text() + "\n" for pagina in leitor.pages)
+        if isinstance(arquivo, (bytes, bytearray)):
+            dados = bytes(arquivo)
+        else:
+            dados = arquivo.getvalue() if hasattr(arquivo, "getvalue") else arquivo.read()
+        return _extrair_texto_pdf_bytes(dados)
     except Exception as e:
         logger.error(f"Erro ao extrair PDF: {e}")
         raise ValueError("Erro ao processar o arquivo PDF")
 
+# Opções fixas dos selectboxes do formulário (tuplas de módulo, sem realocação a cada rerun)
+_TIPO_OBRA_OPCOES = (
+    "Selecione...",
+    "Construção Nova",
+    "Reforma com Ampliação",
+    "Reforma sem Ampliação",
+    "Regularização",
+    "Demolição e Reconstrução",
+    "Outros",
+)
+
+_CATEGORIA_USO_OPCOES = (
+    "Selecione...",
+    "Residencial",
+    "Comercial",
+    "Serviços",
+    "Industrial",
+    "Institucional",
+    "Misto",
+    "Outros",
+)
+
+# Categoria -> (rótulo, opções, ajuda) do selectbox de subcategoria
+_SUBCATEGORIAS_USO: Dict[str, Tuple[str, Tuple[str, ...], str]] = {
+    "Residencial": (
+        "Subcategoria Residencial:",
+        (
+            "Selecione...",
+            "Unifamiliar",
+            "Multifamiliar (até 4 unidades)",
+            "Multifamiliar (mais de 4 unidades)",
+            "Conjunto Habitacional",
+            "Habitação de Interesse Social",
+        ),
+        "Especifique o tipo de uso residencial",
+    ),
+    "Comercial": (
+        "Subcategoria Comercial:",
+        (
+            "Selecione...",
+            "Comércio Vicinal (bairro)",
+            "Comércio Setorial",
+            "Centro Comercial/Shopping",
+            "Atacado",
+            "Outros",
+        ),
+        "Especifique o tipo de comércio",
+    ),
+    "Serviços": (
+        "Subcategoria Serviços:",
+        (
+            "Selecione...",
+            "Serviços Profissionais",
+            "Serviços de Saúde",
+            "Educação",
+            "Hotelaria",
+            "Outros",
+        ),
+        "Especifique o tipo de serviço",
+    ),
+    "Misto": (
+        "Tipo de Uso Misto:",
+        (
+            "Selecione...",
+            "Residencial + Comercial",
+            "Residencial + Serviços",
+            "Comercial + Serviços",
+            "Outros",
+        ),
+        "Especifique a combinação de usos",
+    ),
+}
+
+_TIPO_POTENCIAL_OPCOES = (
+    "Selecione...",
+    "Outorga Onerosa do Direito de Construir",
+    "Transferência do Direito de Construir (TDC)",
+    "CEPAC (Curitiba)",
+    "Outros",
+)
+
+_TIPO_RECUO_OPCOES = ("Recuos mínimos", "Recuos obrigatórios")
+
 def criar_formulario_estruturado():
     """Cria formulário estruturado para coleta de dados do projeto"""
     
@@ -1723,15 +2352,7 @@ def criar_formulario_estruturado():
     # Tipo de Obra
     tipo_obra = st.sidebar.selectbox(
         "Tipo de Obra:",
-        [
-            "Selecione...",
-            "Construção Nova",
-            "Reforma com Ampliação",
-            "Reforma sem Ampliação", 
-            "Regularização",
-            "Demolição e Reconstrução",
-            "Outros"
-        ],
+        _TIPO_OBRA_OPCOES,
         help="O tipo de obra pode influenciar na aplicação de certas regulamentações específicas"
     )
     
@@ -1744,73 +2365,16 @@ def criar_formulario_estruturado():
     # Uso da Edificação - Sistema hierárquico
     categoria_uso = st.sidebar.selectbox(
         "Categoria de Uso:",
-        [
-            "Selecione...",
-            "Residencial",
-            "Comercial",
-            "Serviços",
-            "Industrial",
-            "Institucional",
-            "Misto",
-            "Outros"
-        ],
+        _CATEGORIA_USO_OPCOES,
         help="Categoria principal do uso da edificação"
     )
     
     # Subcategoria baseada na categoria principal
     uso_pretendido = "Selecione..."
-    if categoria_uso == "Residencial":
-        uso_pretendido = st.sidebar.selectbox(
-            "Subcategoria Residencial:",
-            [
-                "Selecione...",
-                "Unifamiliar",
-                "Multifamiliar (até 4 unidades)",
-                "Multifamiliar (mais de 4 unidades)",
-                "Conjunto Habitacional",
-                "Habitação de Interesse Social"
-            ],
-            help="Especifique o tipo de uso residencial"
-        )
-    elif categoria_uso == "Comercial":
-        uso_pretendido = st.sidebar.selectbox(
-            "Subcategoria Comercial:",
-            [
-                "Selecione...",
-                "Comércio Vicinal (bairro)",
-                "Comércio Setorial",
-                "Centro Comercial/Shopping",
-                "Atacado",
-                "Outros"
-            ],
-            help="Especifique o tipo de comércio"
-        )
-    elif categoria_uso == "Serviços":
-        uso_pretendido = st.sidebar.selectbox(
-            "Subcategoria Serviços:",
-            [
-                "Selecione...",
-                "Serviços Profissionais",
-                "Serviços de Saúde",
-                "Educação",
-                "Hotelaria",
-                "Outros"
-            ],
-            help="Especifique o tipo de serviço"
-        )
-    elif categoria_uso == "Misto":
-        uso_pretendido = st.sidebar.selectbox(
-            "Tipo de Uso Misto:",
-            [
-                "Selecione...",
-                "Residencial + Comercial",
-                "Residencial + Serviços",
-                "Comercial + Serviços",
-                "Outros"
-            ],
-            help="Especifique a combinação de usos"
-        )
-    elif categoria_uso not in ["Selecione...", "Outros"]:
+    if categoria_uso in _SUBCATEGORIAS_USO:
+        rotulo, opcoes, ajuda = _SUBCATEGORIAS_USO[categoria_uso]
+        uso_pretendido = st.sidebar.selectbox(rotulo, opcoes, help=ajuda)
+    elif categoria_uso not in ("Selecione...", "Outros"):
         uso_pretendido = categoria_uso
     
     # =============================================
@@ -1907,13 +2471,7 @@ def criar_formulario_estruturado():
     if utiliza_potencial_adicional:
         tipo_potencial = st.sidebar.selectbox(
             "Tipo de Potencial Adicional:",
-            [
-                "Selecione...",
-                "Outorga Onerosa do Direito de Construir",
-                "Transferência do Direito de Construir (TDC)",
-                "CEPAC (Curitiba)",
-                "Outros"
-            ],
+            _TIPO_POTENCIAL_OPCOES,
             help="Especifique o instrumento urbanístico utilizado para obter potencial construtivo adicional"
         )
     
@@ -2051,7 +2609,7 @@ def criar_formulario_estruturado():
     st.sidebar.markdown("**Recuos:**")
     tipo_recuo = st.sidebar.selectbox(
         "Tipo de recuo:",
-        ["Recuos mínimos", "Recuos obrigatórios"],
+        _TIPO_RECUO_OPCOES,
         help="Define se usar valores mínimos ou obrigatórios da legislação"
     )
     
@@ -2068,14 +2626,12 @@ def criar_formulario_estruturado():
     endereco_obrigatorio = bool(endereco and endereco.strip())
     inscricao_obrigatoria = bool(inscricao_imobiliaria and inscricao_imobiliaria.strip())
     
-    # Verificar se outros campos estão preenchidos (complementares)
-    campos_complementares = [
-        area_lote > 0, uso_pretendido != "Selecione...", 
-        area_projecao > 0, area_construida > 0, altura_edificacao > 0,
-        inscricao_imobiliaria
-    ]
-    
-    pelo_menos_um_campo = endereco_obrigatorio and inscricao_obrigatoria and any(campo for campo in campos_complementares)
+    # Verificar se outros campos estão preenchidos (complementares, avaliados só até o primeiro preenchido)
+    pelo_menos_um_campo = endereco_obrigatorio and inscricao_obrigatoria and (
+        area_lote > 0 or uso_pretendido != "Selecione..."
+        or area_projecao > 0 or area_construida > 0 or altura_edificacao > 0
+        or bool(inscricao_imobiliaria)
+    )
     
     # Validações lógicas
     validacoes_ok = True
@@ -2216,61 +2772,131 @@ def criar_formulario_estruturado():
         'zona_parametros': zona_parametros
     }
 
-def main():
-    """Aplicação principal com formulário estruturado"""
-    configurar_pagina()
-    
-    # Initialize engine
-    if 'engine' not in st.session_state:
-        st.session_state.engine = AnalysisEngine()
-    
-    if 'analysis_result' not in st.session_state:
-        st.session_state.analysis_result = None
-    
-    # Criar formulário estruturado
-    dados = criar_formulario_estruturado()
-    
-    # Processo de análise
-    if dados['analisar']:
-        # Criar memorial descritivo estruturado a partir dos dados (com tratamento de campos vazios)
-        memorial = f"""
+# Template do memorial descritivo gerado a partir do formulário (campos preenchidos por _montar_memorial)
+_MEMORIAL_TEMPLATE = """
 DADOS DO PROJETO URBANÍSTICO
 
 1. IDENTIFICAÇÃO:
-- Endereço: {dados['endereco'] if dados['endereco'] else 'NÃO INFORMADO'}
-- Inscrição Imobiliária: {dados['inscricao_imobiliaria'] if dados['inscricao_imobiliaria'] else 'NÃO INFORMADA'}
-- Categoria de Uso: {dados['categoria_uso'] if dados['categoria_uso'] != 'Selecione...' else 'NÃO INFORMADA'}
-- Uso Específico: {dados['uso_pretendido'] if dados['uso_pretendido'] != 'Selecione...' else 'NÃO INFORMADO'}
-- Tipo de Obra: {dados['tipo_obra'] if dados['tipo_obra'] != 'Selecione...' else 'NÃO INFORMADO'}
+- Endereço: {endereco}
+- Inscrição Imobiliária: {inscricao_imobiliaria}
+- Categoria de Uso: {categoria_uso}
+- Uso Específico: {uso_pretendido}
+- Tipo de Obra: {tipo_obra}
 
 2. DADOS DO LOTE:
-- Área Total: {dados['area_lote']:.2f} m² {('(NÃO INFORMADA)' if dados['area_lote'] == 0 else '')}
-- Lote de Esquina: {'SIM' if dados['lote_esquina'] else 'NÃO'}
-- Topografia Acidentada: {'SIM' if dados['topografia_acidentada'] else 'NÃO'}
-- Área de APP: {dados['area_app']:.2f} m² ({('SIM' if dados['possui_app'] else 'NÃO')})
-- Área de Drenagem: {dados['area_drenagem']:.2f} m² ({('SIM' if dados['possui_drenagem'] else 'NÃO')})
-- Área Permeável: {dados['area_permeavel']:.2f} m² {('(NÃO INFORMADA)' if dados['area_permeavel'] == 0 else '')}
+- Área Total: {area_lote:.2f} m² {area_lote_flag}
+- Lote de Esquina: {lote_esquina}
+- Topografia Acidentada: {topografia_acidentada}
+- Área de APP: {area_app:.2f} m² ({possui_app})
+- Área de Drenagem: {area_drenagem:.2f} m² ({possui_drenagem})
+- Área Permeável: {area_permeavel:.2f} m² {area_permeavel_flag}
 
 3. PARÂMETROS DA EDIFICAÇÃO:
-- Área de Projeção: {dados['area_projecao']:.2f} m² {('(NÃO INFORMADA)' if dados['area_projecao'] == 0 else '')}
-- Área Construída Total: {dados['area_construida']:.2f} m² {('(NÃO INFORMADA)' if dados['area_construida'] == 0 else '')}
-- Altura da Edificação: {dados['altura_edificacao']:.2f} m {('(NÃO INFORMADA)' if dados['altura_edificacao'] == 0 else '')}
-- Número de Pavimentos: {dados['num_pavimentos']} {('(NÃO INFORMADO)' if dados['num_pavimentos'] == 1 else '')}
-- Unidades Habitacionais: {dados['num_unidades_habitacionais']} {('(NÃO INFORMADO)' if dados['num_unidades_habitacionais'] == 0 else '')}
-- Unidades Não Habitacionais: {dados['num_unidades_nao_habitacionais']} {('(NÃO INFORMADO)' if dados['num_unidades_nao_habitacionais'] == 0 else '')}
-- Potencial Construtivo Adicional: {'SIM' if dados['utiliza_potencial_adicional'] else 'NÃO'}{(' (' + str(dados['tipo_potencial']) + ')') if dados['utiliza_potencial_adicional'] and dados['tipo_potencial'] and dados['tipo_potencial'] != 'Selecione...' else ''}
-- Vagas de Estacionamento: {dados['num_vagas']} {('(NÃO INFORMADO)' if dados['num_vagas'] == 0 else '')}
+- Área de Projeção: {area_projecao:.2f} m² {area_projecao_flag}
+- Área Construída Total: {area_construida:.2f} m² {area_construida_flag}
+- Altura da Edificação: {altura_edificacao:.2f} m {altura_edificacao_flag}
+- Número de Pavimentos: {num_pavimentos} {num_pavimentos_flag}
+- Unidades Habitacionais: {num_unidades_habitacionais} {num_unidades_habitacionais_flag}
+- Unidades Não Habitacionais: {num_unidades_nao_habitacionais} {num_unidades_nao_habitacionais_flag}
+- Potencial Construtivo Adicional: {potencial_adicional}
+- Vagas de Estacionamento: {num_vagas} {num_vagas_flag}
 
 4. AFASTAMENTOS (RECUOS):
-{('- Recuo Frontal Principal: ' + str(dados['recuo_frontal']) + ' m ' + ('(NÃO INFORMADO)' if dados['recuo_frontal'] == 0 else '') + chr(10) + '- Recuo Frontal Secundário: ' + str(dados['recuo_frontal_secundario']) + ' m ' + ('(NÃO INFORMADO)' if dados['recuo_frontal_secundario'] == 0 else '') + chr(10) + '- Recuo Lateral: ' + str(dados['recuo_lateral_dir']) + ' m ' + ('(NÃO INFORMADO)' if dados['recuo_lateral_dir'] == 0 else '')) if dados['lote_esquina'] else ('- Recuo Frontal: ' + str(dados['recuo_frontal']) + ' m ' + ('(NÃO INFORMADO)' if dados['recuo_frontal'] == 0 else '') + chr(10) + '- Recuo Lateral Direito: ' + str(dados['recuo_lateral_dir']) + ' m ' + ('(NÃO INFORMADO)' if dados['recuo_lateral_dir'] == 0 else '') + chr(10) + '- Recuo Lateral Esquerdo: ' + str(dados['recuo_lateral_esq']) + ' m ' + ('(NÃO INFORMADO)' if dados['recuo_lateral_esq'] == 0 else ''))}
-- Recuo de Fundos: {dados['recuo_fundos']:.2f} m {('(NÃO INFORMADO)' if dados['recuo_fundos'] == 0 else '')}
+{recuos}
+- Recuo de Fundos: {recuo_fundos:.2f} m {recuo_fundos_flag}
 
 5. ÍNDICES CALCULADOS:
-- Taxa de Ocupação: {dados['taxa_ocupacao']:.2f}% {('(IMPOSSÍVEL CALCULAR - DADOS INSUFICIENTES)' if dados['area_lote'] == 0 else '')}
-- Coeficiente de Aproveitamento: {dados['coeficiente_aproveitamento']:.2f} {('(IMPOSSÍVEL CALCULAR - DADOS INSUFICIENTES)' if dados['area_lote'] == 0 else '')}
+- Taxa de Ocupação: {taxa_ocupacao:.2f}% {indices_flag}
+- Coeficiente de Aproveitamento: {coeficiente_aproveitamento:.2f} {indices_flag}
 
 OBSERVAÇÃO: Dados não informados serão considerados como FALTANTES na análise de conformidade.
 """
+
+def _linha_recuo(rotulo: str, valor) -> str:
+    """Linha de recuo do memorial, marcando valores zerados como não informados"""
+    return f"- {rotulo}: {valor} m {'(NÃO INFORMADO)' if valor == 0 else ''}"
+
+def _montar_memorial(dados: dict) -> str:
+    """Preenche o template do memorial com os dados do formulário (com tratamento de campos vazios)"""
+    nao_informada, nao_informado = '(NÃO INFORMADA)', '(NÃO INFORMADO)'
+    if dados['lote_esquina']:
+        recuos = (
+            _linha_recuo('Recuo Frontal Principal', dados['recuo_frontal']),
+            _linha_recuo('Recuo Frontal Secundário', dados['recuo_frontal_secundario']),
+            _linha_recuo('Recuo Lateral', dados['recuo_lateral_dir']),
+        )
+    else:
+        recuos = (
+            _linha_recuo('Recuo Frontal', dados['recuo_frontal']),
+            _linha_recuo('Recuo Lateral Direito', dados['recuo_lateral_dir']),
+            _linha_recuo('Recuo Lateral Esquerdo', dados['recuo_lateral_esq']),
+        )
+    
+    potencial_adicional = 'SIM' if dados['utiliza_potencial_adicional'] else 'NÃO'
+    if dados['utiliza_potencial_adicional'] and dados['tipo_potencial'] and dados['tipo_potencial'] != 'Selecione...':
+        potencial_adicional += f" ({dados['tipo_potencial']})"
+    
+    return _MEMORIAL_TEMPLATE.format_map({
+        'endereco': dados['endereco'] or 'NÃO INFORMADO',
+        'inscricao_imobiliaria': dados['inscricao_imobiliaria'] or 'NÃO INFORMADA',
+        'categoria_uso': dados['categoria_uso'] if dados['categoria_uso'] != 'Selecione...' else 'NÃO INFORMADA',
+        'uso_pretendido': dados['uso_pretendido'] if dados['uso_pretendido'] != 'Selecione...' else 'NÃO INFORMADO',
+        'tipo_obra': dados['tipo_obra'] if dados['tipo_obra'] != 'Selecione...' else 'NÃO INFORMADO',
+        'area_lote': dados['area_lote'],
+        'area_lote_flag': nao_informada if dados['area_lote'] == 0 else '',
+        'lote_esquina': 'SIM' if dados['lote_esquina'] else 'NÃO',
+        'topografia_acidentada': 'SIM' if dados['topografia_acidentada'] else 'NÃO',
+        'area_app': dados['area_app'],
+        'possui_app': 'SIM' if dados['possui_app'] else 'NÃO',
+        'area_drenagem': dados['area_drenagem'],
+        'possui_drenagem': 'SIM' if dados['possui_drenagem'] else 'NÃO',
+        'area_permeavel': dados['area_permeavel'],
+        'area_permeavel_flag': nao_informada if dados['area_permeavel'] == 0 else '',
+        'area_projecao': dados['area_projecao'],
+        'area_projecao_flag': nao_informada if dados['area_projecao'] == 0 else '',
+        'area_construida': dados['area_construida'],
+        'area_construida_flag': nao_informada if dados['area_construida'] == 0 else '',
+        'altura_edificacao': dados['altura_edificacao'],
+        'altura_edificacao_flag': nao_informada if dados['altura_edificacao'] == 0 else '',
+        'num_pavimentos': dados['num_pavimentos'],
+        'num_pavimentos_flag': nao_informado if dados['num_pavimentos'] == 1 else '',
+        'num_unidades_habitacionais': dados['num_unidades_habitacionais'],
+        'num_unidades_habitacionais_flag': nao_informado if dados['num_unidades_habitacionais'] == 0 else '',
+        'num_unidades_nao_habitacionais': dados['num_unidades_nao_habitacionais'],
+        'num_unidades_nao_habitacionais_flag': nao_informado if dados['num_unidades_nao_habitacionais'] == 0 else '',
+        'potencial_adicional': potencial_adicional,
+        'num_vagas': dados['num_vagas'],
+        'num_vagas_flag': nao_informado if dados['num_vagas'] == 0 else '',
+        'recuos': "\n".join(recuos),
+        'recuo_fundos': dados['recuo_fundos'],
+        'recuo_fundos_flag': nao_informado if dados['recuo_fundos'] == 0 else '',
+        'taxa_ocupacao': dados['taxa_ocupacao'],
+        'coeficiente_aproveitamento': dados['coeficiente_aproveitamento'],
+        'indices_flag': '(IMPOSSÍVEL CALCULAR - DADOS INSUFICIENTES)' if dados['area_lote'] == 0 else '',
+    })
+
+@st.cache_resource(show_spinner=False)
+def _get_engine() -> AnalysisEngine:
+    """AnalysisEngine única por processo (evita reinicializar a cada sessão)"""
+    return AnalysisEngine()
+
+def main():
+    """Aplicação principal com formulário estruturado"""
+    configurar_pagina()
+    
+    # Engine compartilhada por todas as sessões do servidor
+    engine = _get_engine()
+    
+    if 'analysis_result' not in st.session_state:
+        st.session_state.analysis_result = None
+    
+    # Criar formulário estruturado
+    dados = criar_formulario_estruturado()
+    
+    # Processo de análise
+    if dados['analisar']:
+        # Criar memorial descritivo estruturado a partir dos dados (com tratamento de campos vazios)
+        memorial = _montar_memorial(dados)
         
         # Executar análise
         try:
@@ -2285,7 +2911,7 @@ OBSERVAÇÃO: Dados não informados serão considerados como FALTANTES na análi
                     'considerar_marquises': dados.get('considerar_marquises', False)
                 }
                 
-                resultado = st.session_state.engine.run_analysis(
+                resultado = engine.run_analysis(
                     cidade=dados['cidade'],
                     endereco=dados['endereco'],
                     memorial=memorial,
@@ -2295,10 +2921,13 @@ OBSERVAÇÃO: Dados não informados serão considerados como FALTANTES na análi
                     dados_formulario=dados
                 )
                 
+                if resultado.get('aviso_deteccao'):
+                    st.info(resultado['aviso_deteccao'])
+                
                 # Adicionar dados do formulário ao resultado
                 resultado['dados_formulario'] = dados
                 st.session_state.analysis_result = resultado
-                st.rerun()
+                # Sem st.rerun(): o bloco de exibição abaixo já renderiza o resultado nesta execução
                 
         except Exception as e:
             st.error(f"❌ Erro na análise: {str(e)}")
@@ -2366,11 +2995,12 @@ OBSERVAÇÃO: Dados não informados serão considerados como FALTANTES na análi
         
         # Status do projeto com containers estilizados
         parecer = resultado['resultado']
-        if "não conformidade" in parecer.lower() or "reprovado" in parecer.lower():
+        parecer_lower = parecer.lower()  # Uma única cópia em minúsculas do parecer
+        if "não conformidade" in parecer_lower or "reprovado" in parecer_lower:
             st.markdown('<div class="resultado-reprovado">', unsafe_allow_html=True)
             st.error("❌ **Projeto REPROVADO**")
             st.markdown('</div>', unsafe_allow_html=True)
-        elif "conformidade" in parecer.lower() or "aprovado" in parecer.lower():
+        elif "conformidade" in parecer_lower or "aprovado" in parecer_lower:
             st.markdown('<div class="resultado-aprovado">', unsafe_allow_html=True)
             st.success("✅ **Projeto APROVADO**")
             st.markdown('</div>', unsafe_allow_html=True)
@@ -2425,5 +3055,4 @@ OBSERVAÇÃO: Dados não informados serão considerados como FALTANTES na análi
     st.markdown('</div>', unsafe_allow_html=True)
 
 if __name__ == "__main__":
-    load_dotenv()
     main()
\ No newline at end of file
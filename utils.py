@@ -29,6 +29,14 @@ class GeoConfig:
 
 CONFIG = GeoConfig()
 
+# Padrões compilados uma única vez (usados a cada geocodificação)
+_ESPACOS_RE = re.compile(r'\s+')
+_PONTUACAO_RE = re.compile(r'[^\w\s,-]')
+_CIDADE_RE = re.compile(r',\s*([^,]+),?\s*(?:brasil|brazil)?$')
+# Valores com cara de zona, usados para identificar a coluna de zonas do shapefile
+_VALOR_ZONA_RE = re.compile(r'\b(ZR|ZS|ZC|ZT|ZONA)')
+_VALOR_ZONA_FALLBACK_RE = re.compile(r'\b(Z[RSC]|ZONA)')
+
 class OptimizedGeocoder:
     """Geocoder otimizado com cache persistente e fallbacks"""
     
@@ -123,8 +131,8 @@ class OptimizedGeocoder:
     def _normalize_address(self, address: str) -> str:
         """Normaliza endereço para chave de cache"""
         normalized = address.lower().strip()
-        normalized = re.sub(r'\s+', ' ', normalized)  # Remove espaços extras
-        normalized = re.sub(r'[^\w\s,-]', '', normalized)  # Remove pontuação
+        normalized = _ESPACOS_RE.sub(' ', normalized)  # Remove espaços extras
+        normalized = _PONTUACAO_RE.sub('', normalized)  # Remove pontuação
         return hashlib.md5(normalized.encode()).hexdigest()
     
     def _try_nominatim(self, address: str) -> Tuple[Optional[float], Optional[float], Optional[str]]:
@@ -153,7 +161,7 @@ class OptimizedGeocoder:
         """Fallback usando API do Brasil (exemplo)"""
         try:
             # Extrai cidade do endereço
-            city_match = re.search(r',\s*([^,]+),?\s*(?:brasil|brazil)?$', address.lower())
+            city_match = _CIDADE_RE.search(address.lower())
             if city_match:
                 city = city_match.group(1).strip()
                 
@@ -238,14 +246,14 @@ class OptimizedZoneFinder:
             if any(pc in col_lower for pc in possible_columns):
                 # Verifica se contém valores que parecem zonas
                 sample_values = self.gdf[col].dropna().astype(str).head(10)
-                if any(re.search(r'\b(ZR|ZS|ZC|ZT|ZONA)', val.upper()) for val in sample_values):
+                if any(_VALOR_ZONA_RE.search(val.upper()) for val in sample_values):
                     return col
         
         # Fallback: primeira coluna que contém texto parecido com zona
         for col in self.gdf.columns:
             if self.gdf[col].dtype == 'object':
                 sample_values = self.gdf[col].dropna().astype(str).head(5)
-                if any(re.search(r'\b(Z[RSC]|ZONA)', val.upper()) for val in sample_values):
+                if any(_VALOR_ZONA_FALLBACK_RE.search(val.upper()) for val in sample_values):
                     return col
         
         # Último fallback: primeira coluna de texto